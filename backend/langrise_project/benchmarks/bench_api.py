@@ -0,0 +1,234 @@
+"""
+End-to-end load test of the API on a seeded dataset of N users x M lists x K words.
+
+Seeds a throwaway test database with the `seed_benchmark_data` command, drives the scenarios below
+in-process through DRF's test client, and writes a JSON report with the p50/p95/p99 latency and the
+queries per request of every scenario and the peak RSS of the whole run. RSS only ever grows, so it
+can't be told apart per scenario; with --trace-memory, the largest growth of the Python heap during a
+request of each scenario is measured with tracemalloc instead, at the cost of slower requests. Pass the
+report of another commit as --compare to print the differences.
+
+Scenarios:
+    words_list_fetch   GET /api/words/?words-list=<id> on a list of K words
+    words_lists_index  GET /api/words-lists/ with the counts of the user's M lists
+    bulk_add           POST /api/words/?words-list=<id> adding --batch words
+    bulk_update        the same endpoint updating the added words
+    bulk_delete        the same endpoint deleting them
+    words_review       POST /api/words-review/ with 200 flashcards ratings
+    story_generation   POST /api/generate-story/ against the local fake story model
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_api [--users 10] [--lists 5] [--words 2000] [--requests 30]
+                                   [--trace-memory] [--output report.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from benchmarks.utils import PROJECT_DIR, setup_django, benchmark_database, percentiles
+
+REVIEW_BATCH_SIZE = 200
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the process so far, in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True,
+                                text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class Recorder:
+    def __init__(self, trace_memory: bool = False):
+        """
+        Collects the latency and the number of queries of every request, per scenario.
+
+        Args:
+            trace_memory (bool): Also record, with tracemalloc, the largest growth of the Python heap
+                during one request of each scenario.
+        """
+        self.trace_memory = trace_memory
+        self.latencies = {}
+        self.queries = {}
+        self.heap_peaks = {}
+
+    def measure(self, scenario: str, send_request):
+        """
+        Sends a request with `send_request()` and records it under the scenario.
+
+        Returns:
+            The response, after checking it succeeded.
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            heap_before = tracemalloc.get_traced_memory()[0]
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = send_request()
+            elapsed = time.perf_counter() - start
+
+        assert 200 <= response.status_code < 300, f"{scenario}: {response.status_code} {response.content[:200]}"
+        self.latencies.setdefault(scenario, []).append(elapsed)
+        self.queries.setdefault(scenario, []).append(len(queries))
+        if self.trace_memory:
+            heap_peak = (tracemalloc.get_traced_memory()[1] - heap_before) / (1024 * 1024)
+            self.heap_peaks[scenario] = max(self.heap_peaks.get(scenario, 0.0), heap_peak)
+        return response
+
+    def report(self) -> dict:
+        report = {}
+        for scenario, latencies in self.latencies.items():
+            report[scenario] = {
+                "requests": len(latencies),
+                "latency_ms": {**percentiles(latencies), "mean": sum(latencies) / len(latencies) * 1000},
+                "queries_per_request": {"mean": sum(self.queries[scenario]) / len(self.queries[scenario]),
+                                        "max": max(self.queries[scenario])},
+            }
+            if self.trace_memory:
+                report[scenario]["request_heap_peak_mb"] = self.heap_peaks[scenario]
+        return report
+
+
+def run_scenarios(args, recorder: Recorder) -> None:
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+    from vocab_app.gen_ai_api import get_chat_model
+    from vocab_app.models import Word, WordsList
+
+    rng = random.Random(args.seed)
+    user = User.objects.get(username=f"{args.prefix}0")
+    words_list = WordsList.objects.filter(user=user).order_by("id").first()
+    word_ids = list(Word.objects.filter(words_list=words_list).order_by("id").values_list("id", flat=True))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    words_url = f"/api/words/?words-list={words_list.id}"
+
+    for _ in range(args.requests):
+        recorder.measure("words_list_fetch", lambda: client.get(words_url))
+        recorder.measure("words_lists_index", lambda: client.get("/api/words-lists/"))
+
+    for iteration in range(args.requests):
+        added = [{"word": f"bulk{iteration}-{index}", "translation": f"translation{index}"}
+                 for index in range(args.batch)]
+        response = recorder.measure("bulk_add", lambda: client.post(words_url, {"add": added}, format="json"))
+        created_ids = response.data["created_ids"]
+        updated = [{"id": word_id, "translation": f"updated{iteration}"} for word_id in created_ids]
+        recorder.measure("bulk_update", lambda: client.post(words_url, {"update": updated}, format="json"))
+        recorder.measure("bulk_delete", lambda: client.post(words_url, {"delete": created_ids}, format="json"))
+
+    for iteration in range(args.requests):
+        start = iteration * REVIEW_BATCH_SIZE % max(len(word_ids) - REVIEW_BATCH_SIZE, 1)
+        reviews = [{"word_id": word_id, "rating": rng.randint(0, 3)}
+                   for word_id in word_ids[start:start + REVIEW_BATCH_SIZE]]
+        recorder.measure("words_review", lambda: client.post("/api/words-review/", {"flashcards": reviews},
+                                                             format="json"))
+
+    provider = {"BACKEND": "fake", "OPTIONS": {"latency": args.story_latency}}
+    with override_settings(STORY_LLM_PROVIDER=provider):
+        get_chat_model.cache_clear()
+        for iteration in range(args.requests):
+            # Distinct words every time, so each story is generated instead of served from the story cache
+            story_words = [f"word{iteration}-{index}" for index in range(10)]
+            recorder.measure("story_generation", lambda: client.post("/api/generate-story/",
+                                                                     {"words": story_words}, format="json"))
+        get_chat_model.cache_clear()
+
+
+def print_summary(report: dict, baseline: dict | None) -> None:
+    for scenario, stats in report["scenarios"].items():
+        latency = stats["latency_ms"]
+        line = (f"{scenario:<18} p50={latency['p50']:8.1f}ms p95={latency['p95']:8.1f}ms "
+                f"p99={latency['p99']:8.1f}ms queries={stats['queries_per_request']['mean']:5.1f}")
+        if "request_heap_peak_mb" in stats:
+            line += f" heap={stats['request_heap_peak_mb']:6.1f}MiB"
+
+        previous = (baseline or {}).get("scenarios", {}).get(scenario)
+        if previous:
+            change = (latency["p50"] / previous["latency_ms"]["p50"] - 1) * 100 if previous["latency_ms"]["p50"] else 0
+            query_change = stats["queries_per_request"]["mean"] - previous["queries_per_request"]["mean"]
+            line += f"  p50 {change:+6.1f}%  queries {query_change:+.1f}"
+        print(line, file=sys.stderr)
+
+    line = f"peak RSS {report['peak_rss_mb']:.1f} MiB"
+    if baseline:
+        line += f" ({report['peak_rss_mb'] - baseline['peak_rss_mb']:+.1f} MiB)"
+    print(line, file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Number of seeded users.")
+    parser.add_argument("--lists", type=int, default=5, help="Number of words lists per user.")
+    parser.add_argument("--words", type=int, default=2000, help="Number of words per list.")
+    parser.add_argument("--requests", type=int, default=30, help="Requests per scenario.")
+    parser.add_argument("--batch", type=int, default=100, help="Words added, updated and deleted per bulk request.")
+    parser.add_argument("--story-latency", type=float, default=0.0, help="Simulated story model latency in seconds.")
+    parser.add_argument("--prefix", default="bench", help="Prefix of the seeded usernames.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the dataset and the review ratings.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Measure the heap growth of each scenario's requests with tracemalloc (slows requests).")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of the standard output.")
+    parser.add_argument("--compare", help="A previous JSON report to compare the results with.")
+    args = parser.parse_args()
+
+    setup_django()
+    import django
+    from django.core.management import call_command
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    recorder = Recorder(trace_memory=args.trace_memory)
+    with benchmark_database():
+        seeding_start = time.perf_counter()
+        call_command("seed_benchmark_data", users=args.users, lists=args.lists, words=args.words,
+                     prefix=args.prefix, seed=args.seed, stdout=sys.stderr)
+        seeding_time = time.perf_counter() - seeding_start
+        if args.trace_memory:
+            tracemalloc.start()
+        run_scenarios(args, recorder)
+        tracemalloc.stop()
+
+    report = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "dataset": {"users": args.users, "lists_per_user": args.lists, "words_per_list": args.words,
+                    "seeding_s": round(seeding_time, 3)},
+        "scenarios": recorder.report(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print_summary(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput of POST /api/words-review/ authenticated with simplejwt's JWTAuthentication against
+CachedJWTAuthentication, which resolves the user from a short-lived cache.
+
+Every request carries a real access token. Reports requests per second, latency percentiles and
+database queries per request on a throwaway test database, then the throughput of the `authenticate`
+call alone, which isn't drowned out by the rest of the request.
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_auth [--requests 2000] [--words 10]
+"""
+import argparse
+import time
+from unittest.mock import patch
+from benchmarks.utils import setup_django, benchmark_database, percentiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per authentication class.")
+    parser.add_argument("--words", type=int, default=10, help="Flashcard ratings sent per review request.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.request import Request
+    from rest_framework.test import APIClient, APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+    from vocab_app.authentication import CachedJWTAuthentication
+    from vocab_app.models import Word, WordsList
+    from vocab_app.views import WordsReviewView
+
+    with benchmark_database():
+        user = User.objects.create_user(username="benchmark", password="benchmark")
+        words_list = WordsList.objects.create(name="Benchmark", user=user)
+        words = Word.objects.bulk_create(
+            [Word(word=f"word{i}", translation=f"translation{i}", words_list=words_list) for i in range(args.words)]
+        )
+        payload = {"flashcards": [{"word_id": word.id, "rating": 3} for word in words]}
+
+        authorization = f"Bearer {AccessToken.for_user(user)}"
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=authorization)
+
+        for authentication_class in (JWTAuthentication, CachedJWTAuthentication):
+            caches["default"].clear()
+            with patch.object(WordsReviewView, "authentication_classes", [authentication_class]):
+                latencies = []
+                query_count = 0
+                for index in range(args.requests):
+                    connection.queries_log.clear()
+                    # Keep the intervals from growing out of the date range
+                    if index % 20 == 0:
+                        Word.objects.filter(words_list=words_list).update(
+                            last_reviewed=None, next_review=None, interval=None, easiness=None, repetitions=None
+                        )
+                    with CaptureQueriesContext(connection) as queries:
+                        request_start = time.perf_counter()
+                        response = client.post("/api/words-review/", payload, format="json")
+                        latencies.append(time.perf_counter() - request_start)
+                    assert response.status_code == 200, response.content
+                    query_count += len(queries.captured_queries)
+
+            stats = percentiles(latencies)
+            print(f"{authentication_class.__name__:<26} {args.requests / sum(latencies):8.1f} req/s  "
+                  f"p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms p99={stats['p99']:.2f}ms  "
+                  f"queries/request={query_count / args.requests:.2f}")
+
+        request = Request(APIRequestFactory().get("/api/words-review/", HTTP_AUTHORIZATION=authorization))
+        for authentication_class in (JWTAuthentication, CachedJWTAuthentication):
+            caches["default"].clear()
+            authentication = authentication_class()
+            start = time.perf_counter()
+            for _ in range(args.requests * 5):
+                authentication.authenticate(request)
+            elapsed = time.perf_counter() - start
+            print(f"{authentication_class.__name__ + '.authenticate':<39} {args.requests * 5 / elapsed:8.1f} calls/s  "
+                  f"{elapsed * 1e6 / (args.requests * 5):.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of write_words answer grading: the previous difflib.SequenceMatcher path against the
+bounded edit distance engine in vocab_app.similarity.
+
+Every pair is distinct and the memo of `answer_grade` is cleared first, so the results measure the cold
+path of a review session, where each answer is graded once.
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_similarity [--pairs 20000] [--length 40]
+"""
+import argparse
+import random
+import string
+import time
+from difflib import SequenceMatcher
+from vocab_app.similarity import answer_grade, answer_similarity, grade_similarity
+
+
+def make_pairs(count: int, length: int, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        original = "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(rng.randint(3, length)))
+        typed = list(original)
+        # Typos for most answers, something completely different for the rest
+        if rng.random() < 0.8:
+            for _ in range(rng.randint(0, 3)):
+                typed[rng.randrange(len(typed))] = rng.choice(string.ascii_lowercase)
+        else:
+            typed = rng.choices(string.ascii_lowercase, k=len(typed))
+        pairs.append((original, "".join(typed)))
+    return pairs
+
+
+def run(name: str, grade, pairs: list[tuple[str, str]]) -> float:
+    start = time.perf_counter()
+    for original, typed in pairs:
+        grade(original, typed)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed * 1e6 / len(pairs):8.1f} us/answer")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=40, help="Maximum length of the words or phrases.")
+    args = parser.parse_args()
+    # Short words repeat by chance; drop the repeats so no answer is graded twice
+    pairs = list(dict.fromkeys(make_pairs(args.pairs, args.length)))
+
+    difflib_time = run("difflib", lambda a, b: grade_similarity(SequenceMatcher(None, a, b).ratio()), pairs)
+    run("exact similarity", lambda a, b: grade_similarity(answer_similarity(a, b)), pairs)
+    answer_grade.cache_clear()
+    graded_time = run("graded with early exit", answer_grade, pairs)
+
+    print(f"speedup {difflib_time / graded_time:.1f}x over difflib on {len(pairs)} distinct answers")
+
+
+if __name__ == "__main__":
+    main()
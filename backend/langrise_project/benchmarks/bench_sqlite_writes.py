@@ -0,0 +1,102 @@
+"""
+Write-contention benchmark of SQLite: several processes POST reviews to /api/words-review/ at the same
+time, against a database file with SQLite's defaults (rollback journal, DEFERRED transactions) and one
+with the SQLITE_TUNING pragmas and IMMEDIATE write transactions.
+
+Reports the review throughput, latency percentiles and the requests that failed, e.g. with
+"database is locked".
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_sqlite_writes [--processes 8] [--requests 200] [--words 20]
+"""
+import argparse
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from benchmarks.utils import setup_django, percentiles
+
+UNTUNED = {'ENABLED': False, 'WRITE_TRANSACTION_MODE': None}
+
+
+def use_database(path: str, tuned: bool) -> None:
+    from django.conf import settings
+    from django.db import connection
+
+    settings.SQLITE_TUNING = {} if tuned else UNTUNED
+    connection.close()
+    connection.settings_dict['NAME'] = path
+
+
+def create_database(path: str, tuned: bool, processes: int, words: int) -> list[list[int]]:
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from vocab_app.models import Word, WordsList
+
+    use_database(path, tuned)
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user(username="benchmark", password="benchmark")
+    word_ids = []
+    for process in range(processes):
+        words_list = WordsList.objects.create(name=f"Benchmark {process}", user=user)
+        created = Word.objects.bulk_create(
+            [Word(word=f"word{i}", translation=f"translation{i}", words_list=words_list) for i in range(words)]
+        )
+        word_ids.append([word.id for word in created])
+    return word_ids
+
+
+def run_writer(path: str, tuned: bool, word_ids: list[int], requests: int) -> tuple[list[float], int]:
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+
+    setup_test_environment()
+    use_database(path, tuned)
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(username="benchmark"))
+    # Failed reviews keep the intervals short, so they never leave the date range
+    payload = {"flashcards": [{"word_id": word_id, "rating": 1} for word_id in word_ids]}
+
+    latencies, failures = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.post("/api/words-review/", payload, format="json")
+        latencies.append(time.perf_counter() - start)
+        failures += response.status_code != 200
+    return latencies, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8, help="Number of concurrent writer processes.")
+    parser.add_argument("--requests", type=int, default=200, help="Review requests per process.")
+    parser.add_argument("--words", type=int, default=20, help="Words reviewed per request.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for tuned in (False, True):
+            path = str(Path(directory) / f"bench_{'tuned' if tuned else 'default'}.sqlite3")
+            word_ids = create_database(path, tuned, args.processes, args.words)
+
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=args.processes, mp_context=context) as executor:
+                start = time.perf_counter()
+                futures = [executor.submit(run_writer, path, tuned, ids, args.requests) for ids in word_ids]
+                results = [future.result() for future in futures]
+                elapsed = time.perf_counter() - start
+
+            latencies = [latency for process_latencies, _ in results for latency in process_latencies]
+            failures = sum(process_failures for _, process_failures in results)
+            stats = percentiles(latencies)
+            print(f"{'tuned' if tuned else 'default':<8} {len(latencies) / elapsed:8.1f} req/s  "
+                  f"p50={stats['p50']:.1f}ms p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms  "
+                  f"failed={failures}/{len(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of the per-request overhead of preparing a story generation call.
+
+Compares building a new chat model, output parser and prompt template for every request (the previous behaviour)
+with the shared client registry and the prompt compiled at import time. No request is sent to the model.
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_story_client [--iterations 200]
+"""
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+
+from langchain_openai import ChatOpenAI
+from langchain.prompts import PromptTemplate
+from langchain.output_parsers import StructuredOutputParser, ResponseSchema
+from vocab_app.gen_ai_api import StoryGenerator, STORY_PROMPT, get_chat_model
+
+WORDS = ["apple", "journey", "music", "river", "friendship", "company", "arrival", "aspirin", "assist", "corn"]
+
+
+def prepare_uncached() -> str:
+    model = ChatOpenAI(model_name="gpt-4o", temperature=0.7, max_tokens=1000)
+    output_parser = StructuredOutputParser.from_response_schemas([
+        ResponseSchema(name="story", description="The generated story"),
+        ResponseSchema(name="questions", description="Questions based on the story"),
+        ResponseSchema(name="answers", description="Answers to the questions"),
+    ])
+    prompt_template = PromptTemplate(
+        input_variables=["words", "language_level", "tone", "sentence_count", "questions_count"],
+        template=STORY_PROMPT,
+        output_parser=output_parser,
+    )
+    assert model.max_tokens
+    return prompt_template.format_prompt(words="|".join(WORDS), language_level="B1", tone="Happy",
+                                         sentence_count=10, questions_count=3).to_string()
+
+
+def prepare_pooled() -> str:
+    generator = StoryGenerator(WORDS, "B1", "Happy")
+    return generator._prepare_prompt().to_string()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    iterations = parser.parse_args().iterations
+
+    get_chat_model("gpt-4o", 0.7, 1000)
+    results = {
+        "new client per request": min(timeit.repeat(prepare_uncached, number=iterations, repeat=3)) / iterations,
+        "pooled client": min(timeit.repeat(prepare_pooled, number=iterations, repeat=3)) / iterations,
+    }
+
+    for name, seconds in results.items():
+        print(f"{name:<24} {seconds * 1e6:10.1f} us/request")
+    print(f"{'speedup':<24} {results['new client per request'] / results['pooled client']:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Load test of POST /api/generate-story/ against the local fake story model.
+
+Drives the endpoint in-process with N concurrent clients on a throwaway test database and reports
+p50/p95/p99 latency and requests per second. No API key is needed.
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_story_endpoint [--clients 8] [--requests 200] [--latency 0.05] [--failure-rate 0]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.utils import setup_django, benchmark_database, percentiles
+
+WORDS = ["apple", "journey", "music", "river", "friendship", "company", "arrival", "aspirin", "assist", "corn"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="Number of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated model latency in seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of model calls that fail.")
+    parser.add_argument("--cache", action="store_true", help="Serve repeated stories from the story cache.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+    from vocab_app.gen_ai_api import get_chat_model
+    from vocab_app.models import UserSettings
+
+    provider = {"BACKEND": "fake", "OPTIONS": {"latency": args.latency, "failure_rate": args.failure_rate}}
+
+    with benchmark_database(), override_settings(STORY_LLM_PROVIDER=provider):
+        get_chat_model.cache_clear()
+        user = User.objects.create_user(username="benchmark", password="benchmark")
+        UserSettings.objects.create(user=user, cache_stories=args.cache)
+
+        def send_request(index: int) -> tuple[float, int]:
+            client = APIClient()
+            client.force_authenticate(user=user)
+            payload = {"words": WORDS[:3 + index % 7], "language_level": "B1", "tone": "Neutral"}
+            start = time.perf_counter()
+            response = client.post("/api/generate-story/", data=payload, format="json")
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            results = list(executor.map(send_request, range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, status_code in results if status_code != 200)
+    summary = percentiles(latencies)
+
+    print(f"clients={args.clients} requests={args.requests} model_latency={args.latency * 1000:.0f}ms "
+          f"failure_rate={args.failure_rate}")
+    print(f"p50={summary['p50']:.1f}ms p95={summary['p95']:.1f}ms p99={summary['p99']:.1f}ms")
+    print(f"throughput={args.requests / elapsed:.1f} req/s errors={errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of GET /api/words/?words-list=<id> on a large words list: ModelSerializer with DRF's stdlib
+JSON renderer (the previous read path), the `.values()` read path with the same renderer, and the
+`.values()` read path with the orjson renderer.
+
+Usage (from backend/langrise_project):
+    python -m benchmarks.bench_word_list [--words 50000] [--repeat 5]
+"""
+import argparse
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+from benchmarks.utils import setup_django, benchmark_database, percentiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=50000, help="Number of words in the list.")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per read path.")
+    args = parser.parse_args()
+
+    setup_django()
+    from datetime import timedelta
+    from django.contrib.auth.models import User
+    from django.utils.timezone import now
+    from rest_framework import viewsets
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from vocab_app.models import Word, WordsList
+    from vocab_app.renderers import ORJSONRenderer
+    from vocab_app.views import ValuesListMixin, WordViewSet
+
+    with benchmark_database():
+        user = User.objects.create_user(username="benchmark", password="benchmark")
+        words_list = WordsList.objects.create(name="Benchmark", user=user)
+        date_now = now()
+        Word.objects.bulk_create([
+            Word(word=f"word{i}", translation=f"translation{i}", pronunciation=f"/wɜːd{i}/", words_list=words_list,
+                 last_reviewed=date_now, next_review=date_now + timedelta(days=i % 30), interval=i % 30 + 1,
+                 easiness=2.5, repetitions=i % 7)
+            for i in range(args.words)
+        ], batch_size=5000)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f"/api/words/?words-list={words_list.id}"
+
+        read_paths = {
+            "serializer + json": [patch.object(ValuesListMixin, "list", viewsets.ModelViewSet.list),
+                                  patch.object(WordViewSet, "renderer_classes", [JSONRenderer])],
+            "values + json": [patch.object(WordViewSet, "renderer_classes", [JSONRenderer])],
+            "values + orjson": [patch.object(WordViewSet, "renderer_classes", [ORJSONRenderer])],
+        }
+
+        for name, patches in read_paths.items():
+            with ExitStack() as stack:
+                for patcher in patches:
+                    stack.enter_context(patcher)
+
+                latencies = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.status_code
+
+            stats = percentiles(latencies)
+            print(f"{name:<18} p50={stats['p50']:8.1f}ms p95={stats['p95']:8.1f}ms  "
+                  f"size={len(response.content) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
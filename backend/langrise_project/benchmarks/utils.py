@@ -0,0 +1,47 @@
+import os
+import statistics
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    """
+    Configures Django for a standalone benchmark script run from backend/langrise_project.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "langrise_project.settings")
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Creates a throwaway test database for the duration of the benchmark, like the test runner does.
+    """
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+        teardown_test_environment
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def percentiles(values: list[float]) -> dict:
+    """
+    Summarizes latencies in seconds as p50/p95/p99 in milliseconds.
+    """
+    if len(values) < 2:
+        value = values[0] * 1000 if values else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": quantiles[49] * 1000, "p95": quantiles[94] * 1000, "p99": quantiles[98] * 1000}
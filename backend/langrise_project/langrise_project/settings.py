@@ -142,11 +142,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'vocab_app.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'vocab_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'vocab_app.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SIMPLE_JWT = {
@@ -158,3 +167,15 @@ SIMPLE_JWT = {
 CORS_ORIGIN_WHITELIST = [
     'http://localhost:5173'
 ]
+
+# vocab_app merges these dict settings over the defaults of the module using them; set only the keys to override.
+#   SQLITE_TUNING       vocab_app.db.SQLITE_TUNING_DEFAULTS
+#   JWT_USER_CACHE      vocab_app.authentication.JWT_USER_CACHE_DEFAULTS (keep the TTL short without a shared cache)
+#   FORECAST_CACHE      vocab_app.forecast.FORECAST_CACHE_DEFAULTS
+#   REVIEW_LOG          vocab_app.review_log.REVIEW_LOG_DEFAULTS
+#   SYNC                vocab_app.sync.SYNC_DEFAULTS
+#   WORD_IMPORT         vocab_app.importer.WORD_IMPORT_DEFAULTS
+#   WORD_EXPORT         vocab_app.exporter.WORD_EXPORT_DEFAULTS
+#   STORY_CACHE         vocab_app.story_cache.STORY_CACHE_DEFAULTS
+#   STORY_WORKER        vocab_app.story_jobs.STORY_WORKER_DEFAULTS
+#   STORY_LLM_PROVIDER  vocab_app.llm_providers.DEFAULT_PROVIDER ('openai', 'fake' or a chat model factory path)
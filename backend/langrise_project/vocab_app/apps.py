@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class VocabAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vocab_app'
+
+    def ready(self):
+        from .authentication import forget_cached_user
+        from .db import configure_sqlite_connection
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='vocab_app_sqlite_tuning')
+        post_save.connect(forget_cached_user, sender=get_user_model(), dispatch_uid='vocab_app_forget_saved_user')
+        post_delete.connect(forget_cached_user, sender=get_user_model(), dispatch_uid='vocab_app_forget_deleted_user')
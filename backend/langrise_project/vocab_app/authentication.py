@@ -0,0 +1,57 @@
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from .conf import get_app_settings
+
+JWT_USER_CACHE_DEFAULTS = {
+    'CACHE': 'default',
+    # Entries are only dropped in the process that changed the user unless CACHE is shared between workers
+    'TTL': 15,
+}
+
+
+def get_jwt_user_cache_config() -> dict:
+    return get_app_settings('JWT_USER_CACHE', JWT_USER_CACHE_DEFAULTS)
+
+
+def make_user_cache_key(user_id) -> str:
+    """
+    Builds the cache key of a user, shared by every access token issued to them.
+    """
+    return f"jwt-user:{user_id}"
+
+
+def forget_cached_user(sender=None, instance=None, **kwargs) -> None:
+    """
+    `post_save` and `post_delete` receiver of the user model dropping the cached user, so every token of
+    a changed, deactivated or deleted user reloads it. With a per-process cache such as the default
+    LocMemCache, other workers keep their entry until the TTL ends.
+    """
+    if instance is not None and instance.pk is not None:
+        config = get_jwt_user_cache_config()
+        caches[config['CACHE']].delete(make_user_cache_key(instance.pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    simplejwt's `JWTAuthentication` keeping the resolved users in a short-lived cache, keyed by the
+    user id of the access token, so repeated requests of a user skip the user query.
+
+    Saving or deleting a user drops their entry for all of their tokens, though only in the cache of the
+    current process unless `JWT_USER_CACHE['CACHE']` is shared between workers; other workers can serve
+    a user up to `JWT_USER_CACHE['TTL']` seconds stale.
+    """
+    def get_user(self, validated_token: Token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        config = get_jwt_user_cache_config()
+        cache = caches[config['CACHE']]
+        key = make_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, config['TTL'])
+        return user
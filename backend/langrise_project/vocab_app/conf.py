@@ -0,0 +1,17 @@
+from django.conf import settings
+
+
+def get_app_settings(name: str, defaults: dict) -> dict:
+    """
+    Returns a dict setting of the app merged over its defaults, which live next to the code using them,
+    so settings.py only lists the keys it overrides. Outside of a configured Django, the defaults are used.
+
+    Args:
+        name (str): The name of the setting, e.g. 'SYNC'.
+        defaults (dict): The value of every key the setting doesn't override.
+
+    Returns:
+        dict: The merged setting.
+    """
+    overrides = getattr(settings, name, {}) if settings.configured else {}
+    return {**defaults, **overrides}
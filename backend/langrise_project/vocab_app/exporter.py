@@ -0,0 +1,80 @@
+import csv
+import itertools
+from functools import partial
+from collections.abc import Iterator
+from datetime import datetime
+import orjson
+from django.db.models import QuerySet
+from .conf import get_app_settings
+from .renderers import ORJSON_OPTIONS
+
+WORD_EXPORT_DEFAULTS = {
+    # Rows fetched from the database cursor and written to the output at a time
+    'CHUNK_SIZE': 2000,
+}
+
+EXPORT_FORMATS = ['csv', 'jsonl']
+
+# The name of the words list comes first; the remaining columns can be imported back by `importer.import_words`
+EXPORT_COLUMNS = ['words_list', 'word', 'translation', 'pronunciation', 'date_added', 'last_reviewed',
+                  'next_review', 'interval', 'easiness', 'repetitions']
+
+
+def get_word_export_config() -> dict:
+    return get_app_settings('WORD_EXPORT', WORD_EXPORT_DEFAULTS)
+
+
+class _EchoBuffer:
+    # A file-like object handing back what `csv.writer` writes, so rows are formatted without buffering them
+    def write(self, value: str) -> str:
+        return value
+
+
+def _format_values(row: tuple) -> list:
+    # Both formats write datetimes in UTC with a Z suffix, the way the API renders them
+    return [value.isoformat().replace('+00:00', 'Z') if isinstance(value, datetime) else value for value in row]
+
+
+def _format_csv_row(writer, row: tuple) -> str:
+    return writer.writerow(_format_values(row))
+
+
+def _format_jsonl_row(row: tuple) -> str:
+    return orjson.dumps(dict(zip(EXPORT_COLUMNS, _format_values(row))), option=ORJSON_OPTIONS).decode() + '\n'
+
+
+def export_words(words: QuerySet, file_format: str, chunk_size: int | None = None) -> Iterator[str]:
+    """
+    Exports words as CSV or JSON Lines, lazily.
+
+    The words are read with a server-side cursor through `QuerySet.iterator`, as tuples of values rather than
+    model instances, and formatted `chunk_size` rows at a time, so memory stays flat however many words are
+    exported. Words are ordered by list, then in the order they were added.
+
+    Args:
+        words (QuerySet): The words to export.
+        file_format (str): One of `EXPORT_FORMATS`.
+        chunk_size (int, optional): The number of rows per chunk. Defaults to `WORD_EXPORT['CHUNK_SIZE']`.
+
+    Returns:
+        Iterator[str]: Chunks of the file, starting with the CSV header.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{file_format}'. Valid options are: {', '.join(EXPORT_FORMATS)}")
+
+    chunk_size = chunk_size or get_word_export_config()['CHUNK_SIZE']
+    rows = words.order_by('words_list', 'id').values_list('words_list__name', *EXPORT_COLUMNS[1:]) \
+                .iterator(chunk_size=chunk_size)
+
+    if file_format == 'csv':
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(EXPORT_COLUMNS)
+        format_row = partial(_format_csv_row, writer)
+    else:
+        format_row = _format_jsonl_row
+
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        yield ''.join(map(format_row, chunk))
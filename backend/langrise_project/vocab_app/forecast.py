@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from django.core.cache import caches
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils.timezone import localdate, make_aware
+from .conf import get_app_settings
+from .models import Word, WordsList
+
+FORECAST_CACHE_DEFAULTS = {
+    'CACHE': 'default',
+    # Forecasts are keyed on the versions of the user's words lists, so any cache backend stays consistent
+    # across processes; the TTL only bounds how long the forecasts of old versions take up space
+    'TTL': 300,
+}
+
+
+def get_forecast_cache_config() -> dict:
+    return get_app_settings('FORECAST_CACHE', FORECAST_CACHE_DEFAULTS)
+
+
+def _words_lists_state(user_id: int) -> str:
+    """
+    Returns a fingerprint of the user's words lists that changes on every write to their words, since
+    each one bumps the `version` and `modified_at` of the lists it touches, and when a list is deleted.
+    """
+    state = WordsList.objects.filter(user=user_id).aggregate(
+        count=Count('id'), versions=Sum('version'), modified_at=Max('modified_at'),
+    )
+    modified_at = state['modified_at'].timestamp() if state['modified_at'] else 0
+    return f"{state['count']}-{state['versions'] or 0}-{modified_at}"
+
+
+def get_review_forecast(user, days: int, words_list_id: int | None = None) -> dict:
+    """
+    Counts the reviews coming due on each of the next `days` days, today included, with one query
+    grouping the words by `TruncDate('next_review')`. Overdue words are counted in today's reviews.
+
+    Forecasts are cached per user, list and window, keyed on the state of the user's words lists, so a
+    cached forecast costs one aggregate query over the lists and none over the words.
+
+    Args:
+        user: The owner of the words.
+        days (int): The length of the forecast, in days.
+        words_list_id (int, optional): Only count the words of this list.
+
+    Returns:
+        dict: The number of `overdue` words and the `forecast`, a list of `date` and `count` pairs for every day.
+    """
+    config = get_forecast_cache_config()
+    cache = caches[config['CACHE']]
+    today = localdate()
+    key = f"forecast:{user.id}:{_words_lists_state(user.id)}:{words_list_id}:{days}:{today.isoformat()}"
+
+    forecast = cache.get(key)
+    if forecast is not None:
+        return forecast
+
+    words = Word.objects.filter(words_list__user=user)
+    if words_list_id is not None:
+        words = words.filter(words_list=words_list_id)
+
+    window_end = make_aware(datetime.combine(today + timedelta(days=days), datetime.min.time()))
+    counts = words.filter(next_review__lt=window_end) \
+                  .annotate(date=TruncDate('next_review')).values('date') \
+                  .annotate(count=Count('id')).values_list('date', 'count')
+
+    counts_by_date = {today + timedelta(days=offset): 0 for offset in range(days)}
+    overdue = 0
+    for date, count in counts:
+        if date < today:
+            overdue += count
+            date = today
+        counts_by_date[date] += count
+
+    forecast = {
+        'overdue': overdue,
+        'forecast': [{'date': date.isoformat(), 'count': count} for date, count in counts_by_date.items()],
+    }
+    cache.set(key, forecast, config['TTL'])
+    return forecast
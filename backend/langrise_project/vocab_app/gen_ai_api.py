@@ -1,14 +1,179 @@
+import json
 import logging
+import re
+import time
+from collections.abc import Iterator
+from functools import lru_cache
 from math import ceil
+import tiktoken
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain.prompts import PromptTemplate
 from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 from langchain_core.prompt_values import PromptValue
+from .llm_providers import create_chat_model
 
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
+DEFAULT_MODEL_NAME = "gpt-4o"
+DEFAULT_TEMPERATURE = 0.7
+
+STORY_PROMPT = """
+        Return your answer in valid JSON with the keys: "story", "questions", and "answers". Include only those keys.
+        Do not wrap your output in triple backticks.
+
+        Create a story using the following words: {words}. The story must be in HTML format, use up to
+        {sentence_count} sentences, reflect a {tone} tone, and match a {language_level} language level.
+        Each sentence should be clear and concise.
+
+        After the story, create {questions_count} statements about the story. Each question must focus on the
+        understanding and usage of a specific word from the list within the story's context. Each statement must be
+        answerable with "R" (True), "F" (False), or "N/A" (Not Mentioned). If it's not in the story, the correct
+        answer is "N/A".
+
+        Example output format (JSON only, without triple backticks):
+
+        {{
+          "story": "<p>...</p>",
+          "questions": "1. Statement\\n2. Statement\\n...",
+          "answers": "1. R\\n2. F\\n..."
+        }}
+                """.strip()
+
+# The parser and the prompt template don't depend on the request, so they are built once at import time
+STORY_OUTPUT_PARSER = StructuredOutputParser.from_response_schemas([
+    ResponseSchema(name="story", description="The generated story"),
+    ResponseSchema(name="questions", description="Questions based on the story"),
+    ResponseSchema(name="answers", description="Answers to the questions"),
+])
+
+STORY_PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=["words", "language_level", "tone", "sentence_count", "questions_count"],
+    template=STORY_PROMPT,
+    output_parser=STORY_OUTPUT_PARSER,
+)
+
+FALLBACK_ENCODING = "o200k_base"
+CHUNK_TOKEN_MARGIN = 16
+QUESTION_NUMBERING = re.compile(r"^\s*\d+\s*[.)]\s*")
+
+
+ENCODER_RETRY_INTERVAL = 60
+
+_encoders: dict[str, tiktoken.Encoding] = {}
+_encoder_failures: dict[str, float] = {}
+
+
+def get_encoder(model_name: str) -> tiktoken.Encoding | None:
+    """
+    Returns the tokenizer of the model, loaded once per process. A failed load is retried once
+    `ENCODER_RETRY_INTERVAL` seconds have passed, so a process started offline doesn't estimate forever.
+
+    Args:
+        model_name (str): Name of the language model.
+
+    Returns:
+        tiktoken.Encoding | None: The encoder, or None if it can't be loaded (e.g. offline without cached files).
+    """
+    encoder = _encoders.get(model_name)
+    if encoder is not None:
+        return encoder
+    failed_at = _encoder_failures.get(model_name)
+    if failed_at is not None and time.monotonic() - failed_at < ENCODER_RETRY_INTERVAL:
+        return None
+
+    try:
+        try:
+            encoder = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoder = tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        logging.warning(f"Could not load the tokenizer for {model_name}, estimating token counts instead: {e}")
+        _encoder_failures[model_name] = time.monotonic()
+        return None
+
+    _encoders[model_name] = encoder
+    _encoder_failures.pop(model_name, None)
+    return encoder
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """
+    Counts the tokens of a text with the model's tokenizer.
+
+    Args:
+        text (str): The text to count.
+        model_name (str): Name of the language model.
+
+    Returns:
+        int: The number of tokens, or a rough estimate (1 token per 4 characters) if the tokenizer is unavailable.
+    """
+    encoder = get_encoder(model_name)
+    if encoder is None:
+        return ceil(len(text) / 4)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def merge_story_results(results: list[dict], question_limit: int | None = None) -> dict:
+    """
+    Merges the stories generated for several chunks of words into one response.
+    Stories are concatenated, questions and answers are renumbered consecutively.
+
+    Args:
+        results (list[dict]): The structured responses of the chunks, in order.
+        question_limit (int, optional): The maximum number of questions to keep, taken from every chunk in turn.
+
+    Returns:
+        dict: A single structured response containing the story, questions, and answers.
+    """
+    def strip_numbering(text: str) -> list[str]:
+        return [QUESTION_NUMBERING.sub("", line).strip() for line in str(text).splitlines() if line.strip()]
+
+    chunks = []
+    for result in results:
+        chunk_questions = strip_numbering(result.get("questions", ""))
+        chunk_answers = strip_numbering(result.get("answers", ""))
+        # Keep questions and answers aligned even if the model returned a different number of each
+        chunk_answers += ["N/A"] * (len(chunk_questions) - len(chunk_answers))
+        chunks.append(list(zip(chunk_questions, chunk_answers)))
+
+    counts = [len(chunk) for chunk in chunks]
+    if question_limit is not None and sum(counts) > question_limit:
+        # The chunks keep their first questions in turn, so the kept ones still cover the words of every chunk
+        counts = [0] * len(chunks)
+        for depth in range(max(len(chunk) for chunk in chunks)):
+            for index, chunk in enumerate(chunks):
+                if depth < len(chunk) and sum(counts) < question_limit:
+                    counts[index] += 1
+
+    pairs = [pair for count, chunk in zip(counts, chunks) for pair in chunk[:count]]
+    questions = [question for question, _ in pairs]
+    answers = [answer for _, answer in pairs]
+
+    return {
+        "story": "\n".join(result.get("story", "") for result in results),
+        "questions": "\n".join(f"{number}. {question}" for number, question in enumerate(questions, start=1)),
+        "answers": "\n".join(f"{number}. {answer}" for number, answer in enumerate(answers, start=1)),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model_name: str, temperature: float, max_tokens: int) -> BaseChatModel:
+    """
+    Returns the process-wide chat model for the given settings, creating it with the configured
+    provider (`STORY_LLM_PROVIDER`) on first use. OpenAI models share keep-alive HTTP connection pools.
+
+    Args:
+        model_name (str): Name of the language model to use.
+        temperature (float): Sampling temperature for model output.
+        max_tokens (int): The maximum number of tokens to generate.
+
+    Returns:
+        BaseChatModel: The shared chat model.
+    """
+    return create_chat_model(model_name, temperature, max_tokens)
+
 
 class StoryGenerator:
     def __init__(
@@ -16,12 +181,13 @@ class StoryGenerator:
             words: list[str],
             language_level: str,
             tone: str,
-            model_name: str = "gpt-4o",
-            temperature: float = 0.7,
+            model_name: str = DEFAULT_MODEL_NAME,
+            temperature: float = DEFAULT_TEMPERATURE,
             max_input_tokens: int = 4096,
             max_output_tokens: int = 1000,
             question_limit: int = 10,
-            sentence_limit: int = 30
+            sentence_limit: int = 30,
+            max_concurrency: int = 4
     ):
         """
         Initializes the StoryGenerator with required parameters.
@@ -36,16 +202,18 @@ class StoryGenerator:
             max_output_tokens (int, optional): The maximum number of tokens to generate. Defaults to 1000.
             question_limit (int, optional): The maximum number of questions to include in the story. Defaults to 10.
             sentence_limit (int, optional): The maximum number of sentences to include in the story. Defaults to 30.
+            max_concurrency (int, optional): The maximum number of chunks generated at the same time when the words
+                don't fit in a single prompt. Defaults to 4.
         """
         self.words = words
         self.language_level = language_level
         self.tone = tone
 
-        self.model = ChatOpenAI(
-            model_name=model_name,
-            temperature=temperature,
-            max_tokens=max_output_tokens,
-        )
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_output_tokens = max_output_tokens
+        self.max_concurrency = max_concurrency
+        self.model = get_chat_model(model_name, temperature, max_output_tokens)
 
         self.question_limit = question_limit
         self.sentence_limit = sentence_limit
@@ -88,17 +256,12 @@ class StoryGenerator:
 
     def _initialize_output_parser(self) -> StructuredOutputParser:
         """
-        Initializes the structured output parser.
+        Returns the structured output parser.
 
         Returns:
-            StructuredOutputParser: The parser for ChatGPT output.
+            StructuredOutputParser: The shared parser for ChatGPT output.
         """
-        response_schemas = [
-            ResponseSchema(name="story", description="The generated story"),
-            ResponseSchema(name="questions", description="Questions based on the story"),
-            ResponseSchema(name="answers", description="Answers to the questions"),
-        ]
-        return StructuredOutputParser.from_response_schemas(response_schemas)
+        return STORY_OUTPUT_PARSER
 
     def _prepare_prompt(self) -> PromptValue:
         """
@@ -107,29 +270,7 @@ class StoryGenerator:
         Returns:
             PromptValue: A PromptValue instance containing the final prompt.
         """
-        template = """
-        Return your answer in valid JSON with the keys: "story", "questions", and "answers". Include only those keys. Do not wrap your output in triple backticks.
-
-        Create a story using the following words: {words}. The story must be in HTML format, use up to {sentence_count} sentences, reflect a {tone} tone, and match a {language_level} language level. Each sentence should be clear and concise.
-
-        After the story, create {questions_count} statements about the story. Each question must focus on the understanding and usage of a specific word from the list within the story's context. Each statement must be answerable with "R" (True), "F" (False), or "N/A" (Not Mentioned). If it's not in the story, the correct answer is "N/A".
-
-        Example output format (JSON only, without triple backticks):
-
-        {{
-          "story": "<p>...</p>",
-          "questions": "1. Statement\\n2. Statement\\n...",
-          "answers": "1. R\\n2. F\\n..."
-        }}
-                """.strip()
-
-        prompt_template = PromptTemplate(
-            input_variables=["words", "language_level", "tone", "sentence_count", "questions_count"],
-            template=template,
-            output_parser=self.output_parser,
-        )
-
-        return prompt_template.format_prompt(
+        return STORY_PROMPT_TEMPLATE.format_prompt(
             words="|".join(self.words),
             language_level=self.language_level,
             tone=self.tone,
@@ -148,8 +289,7 @@ class StoryGenerator:
         Raises:
             ValueError: If the estimated token usage exceeds the max_tokens limit.
         """
-        # Approximate token count for the prompt (1 token per 4 characters is a rough estimate)
-        prompt_token_count = len(prompt) // 4
+        prompt_token_count = count_tokens(prompt, self.model_name)
         estimated_total_tokens = prompt_token_count + self.model.max_tokens
 
         if estimated_total_tokens > max_tokens:
@@ -173,7 +313,12 @@ class StoryGenerator:
         """
         prompt = self._prepare_prompt()
 
-        self._validate_token_limit(prompt.to_string(), self.max_input_tokens)
+        try:
+            self._validate_token_limit(prompt.to_string(), self.max_input_tokens)
+        except ValueError:
+            if len(self.words) < 2:
+                raise
+            return self._generate_chunked_story()
 
         logging.info("Invoking the language model with the prepared prompt...")
 
@@ -188,10 +333,211 @@ class StoryGenerator:
 
         return structured_response
 
+    def _split_words(self) -> list[list[str]]:
+        """
+        Splits the words into chunks whose prompts fit in the token budget.
+
+        Returns:
+            list[list[str]]: The chunks of words, in the original order.
+
+        Raises:
+            ValueError: If a single word doesn't fit in the budget.
+        """
+        empty_prompt = self._prepare_prompt().to_string().replace("|".join(self.words), "")
+        available_tokens = (self.max_input_tokens - self.model.max_tokens - CHUNK_TOKEN_MARGIN
+                            - count_tokens(empty_prompt, self.model_name))
+
+        chunks, chunk, chunk_tokens = [], [], 0
+        for word in self.words:
+            word_tokens = count_tokens(f"{word}|", self.model_name)
+            if word_tokens > available_tokens:
+                raise ValueError(f"The word '{word[:50]}' doesn't fit in the maximum allowed token limit of "
+                                 f"{self.max_input_tokens}.")
+            if chunk and chunk_tokens + word_tokens > available_tokens:
+                chunks.append(chunk)
+                chunk, chunk_tokens = [], 0
+            chunk.append(word)
+            chunk_tokens += word_tokens
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _prepare_chunk_prompts(self) -> list[PromptValue]:
+        """
+        Prepares one prompt per chunk of words from `_split_words`, each validated against the token budget.
+
+        Returns:
+            list[PromptValue]: The prompts of the chunks, in order.
+
+        Raises:
+            ValueError: If a word or the prompt of a chunk doesn't fit in the budget.
+        """
+        generators = [
+            StoryGenerator(
+                words=chunk,
+                language_level=self.language_level,
+                tone=self.tone,
+                model_name=self.model_name,
+                temperature=self.temperature,
+                max_input_tokens=self.max_input_tokens,
+                max_output_tokens=self.max_output_tokens,
+                question_limit=self.question_limit,
+                sentence_limit=self.sentence_limit,
+            )
+            for chunk in self._split_words()
+        ]
+        prompts = [generator._prepare_prompt() for generator in generators]
+        for prompt in prompts:
+            self._validate_token_limit(prompt.to_string(), self.max_input_tokens)
+        return prompts
+
+    def _generate_chunked_story(self) -> dict:
+        """
+        Generates one sub-story per chunk of words concurrently and merges them into one response.
+
+        Returns:
+            dict: A structured response containing the merged story, questions, and answers.
+        """
+        prompts = self._prepare_chunk_prompts()
+
+        logging.info(f"Invoking the language model for {len(prompts)} chunks of words...")
+
+        try:
+            responses = self.model.batch(prompts, config={"max_concurrency": self.max_concurrency})
+            logging.info('Parsing the model responses...')
+        except Exception as e:
+            logging.error(f"Error invoking the model: {e}")
+            raise RuntimeError("Model invocation failed.") from e
+
+        return merge_story_results([self.output_parser.parse(response.content) for response in responses],
+                                   self.question_limit)
+
+
+class JsonStringFieldStream:
+    JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, field: str):
+        """
+        Incrementally extracts the value of one string field from a JSON object received in chunks.
+
+        Args:
+            field (str): The name of the field to extract.
+        """
+        self.field_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.buffer = ""
+        self.started = False
+        self.finished = False
+
+    def feed(self, text: str) -> str:
+        """
+        Consumes the next chunk of the JSON text.
+
+        Args:
+            text (str): The next chunk of the raw JSON.
+
+        Returns:
+            str: The decoded part of the field value that became available with this chunk.
+        """
+        if self.finished:
+            return ""
+
+        self.buffer += text
+        if not self.started:
+            match = self.field_pattern.search(self.buffer)
+            if match is None:
+                return ""
+            self.buffer = self.buffer[match.end():]
+            self.started = True
+
+        decoded = []
+        position = 0
+        while position < len(self.buffer):
+            char = self.buffer[position]
+            if char == '"':
+                self.finished = True
+                position += 1
+                break
+            if char != '\\':
+                decoded.append(char)
+                position += 1
+                continue
+
+            # Escape sequences may be split between chunks, wait for the rest of them
+            if position + 1 >= len(self.buffer):
+                break
+            escaped = self.buffer[position + 1]
+            if escaped != 'u':
+                decoded.append(self.JSON_ESCAPES.get(escaped, escaped))
+                position += 2
+                continue
+
+            length = 6
+            if position + 6 <= len(self.buffer) and 0xD800 <= int(self.buffer[position + 2:position + 6], 16) < 0xDC00:
+                length = 12
+            if position + length > len(self.buffer):
+                break
+            decoded.append(json.loads(f'"{self.buffer[position:position + length]}"'))
+            position += length
+
+        self.buffer = self.buffer[position:]
+        return "".join(decoded)
+
+
+class StreamingStoryGenerator(StoryGenerator):
+    def stream_story(self) -> Iterator[tuple[str, str | dict]]:
+        """
+        Generates a story using the model's token stream.
+
+        The prompt is validated immediately, so a ValueError is raised before any event is produced. Words that
+        don't fit in one prompt are split like in `generate_story`, and the chunks are streamed one after another.
+
+        Returns:
+            Iterator[tuple[str, str | dict]]: ("story", html_chunk) events while the story arrives, followed by
+                a single ("result", structured_response) event with the story, questions and answers.
+        """
+        prompt = self._prepare_prompt()
+
+        try:
+            self._validate_token_limit(prompt.to_string(), self.max_input_tokens)
+        except ValueError:
+            if len(self.words) < 2:
+                raise
+            return self._stream_events(self._prepare_chunk_prompts())
+
+        return self._stream_events([prompt])
+
+    def _stream_events(self, prompts: list[PromptValue]) -> Iterator[tuple[str, str | dict]]:
+        logging.info(f"Streaming the language model response for {len(prompts)} prompts...")
+        results = []
+
+        for index, prompt in enumerate(prompts):
+            story_stream = JsonStringFieldStream("story")
+            content = []
+            # The stories of the chunks are joined by a newline, like in `merge_story_results`
+            if index:
+                yield "story", "\n"
+
+            try:
+                for chunk in self.model.stream(prompt):
+                    content.append(chunk.content)
+                    story_chunk = story_stream.feed(chunk.content)
+                    if story_chunk:
+                        yield "story", story_chunk
+                logging.info('Parsing the model response...')
+            except Exception as e:
+                logging.error(f"Error streaming from the model: {e}")
+                raise RuntimeError("Model invocation failed.") from e
+
+            results.append(self.output_parser.parse("".join(content)))
+
+        yield "result", results[0] if len(results) == 1 else merge_story_results(results, self.question_limit)
+
 
 # Example usage:
 if __name__ == "__main__":
-    words = ["apple", "journey", "music", "river", "friendship", "company", "arrival", "aspirin", "assist", "corn", "cute"]
+    words = ["apple", "journey", "music", "river", "friendship", "company", "arrival", "aspirin", "assist", "corn",
+             "cute"]
     generator = StoryGenerator(words, "B1", "Inspiring")
     result = generator.generate_story()
 
@@ -200,6 +546,5 @@ if __name__ == "__main__":
     print("Questions:\n", result["questions"])
     print("Answers:\n", result["answers"])
 
-    import json
     with open("story.json", "w") as f:
         json.dump(result, f, indent=4)
@@ -0,0 +1,207 @@
+import csv
+import html
+import itertools
+from collections.abc import Callable, Iterable, Iterator
+from django.utils.html import strip_tags
+from .conf import get_app_settings
+from .db import write_transaction
+from .models import Word, WordsList
+from .utils import bump_words_lists_version
+
+WORD_IMPORT_DEFAULTS = {
+    # Words inserted per transaction; each committed chunk is reported through the progress callback
+    'CHUNK_SIZE': 1000,
+    # Invalid rows past this many are counted without a message, so a broken file doesn't fill the memory
+    'MAX_REPORTED_ERRORS': 20,
+}
+
+IMPORT_FORMATS = {
+    'csv': ',',
+    'tsv': '\t',
+    'anki': '\t',
+}
+
+FILE_EXTENSION_FORMATS = {
+    'csv': 'csv',
+    'tsv': 'tsv',
+    'tab': 'tsv',
+    'txt': 'anki',
+}
+
+HEADER_COLUMNS = ['word', 'translation', 'pronunciation']
+
+# Separators of Anki's "Notes in Plain Text" exports, from their `#separator:` header
+ANKI_SEPARATORS = {
+    'tab': '\t',
+    'comma': ',',
+    'semicolon': ';',
+    'pipe': '|',
+    'space': ' ',
+    'colon': ':',
+}
+
+
+def get_word_import_config() -> dict:
+    return get_app_settings('WORD_IMPORT', WORD_IMPORT_DEFAULTS)
+
+
+def guess_import_format(file_name: str) -> str:
+    """
+    Guesses the import format from a file extension, defaulting to CSV.
+    """
+    extension = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+    return FILE_EXTENSION_FORMATS.get(extension, 'csv')
+
+
+def _parse_anki_headers(lines: Iterator[str]) -> tuple[dict, list[str], int]:
+    """
+    Reads the `#key:value` header lines of an Anki export.
+
+    Returns:
+        tuple[dict, list[str], int]: The headers, the first line after them (if any) and the number of header lines.
+    """
+    headers = {}
+    header_count = 0
+    for line in lines:
+        if not line.startswith('#'):
+            return headers, [line], header_count
+        key, _, value = line[1:].rstrip('\r\n').partition(':')
+        headers[key.strip().lower()] = value.strip()
+        header_count += 1
+    return headers, [], header_count
+
+
+def iter_import_rows(lines: Iterable[str], file_format: str) -> Iterator[tuple[int, list[str]]]:
+    """
+    Parses an import file lazily, one row at a time, so files of any size are read in constant memory.
+
+    CSV and TSV files may start with a header naming the `word`, `translation` and `pronunciation`
+    columns; otherwise the columns are taken in that order. Anki exports may start with `#separator:`,
+    `#html:` and `#... column:` headers; the note type, deck, GUID and tag columns are dropped and
+    HTML is stripped from the fields.
+
+    Args:
+        lines (Iterable[str]): The lines of the file, e.g. an open text file.
+        file_format (str): One of `IMPORT_FORMATS`.
+
+    Returns:
+        Iterator[tuple[int, list[str]]]: The line number and the word, translation and pronunciation of every
+            non-empty row, with missing columns as empty strings.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format '{file_format}'. Valid options are: {', '.join(IMPORT_FORMATS)}")
+
+    lines = iter(lines)
+    delimiter = IMPORT_FORMATS[file_format]
+    line_offset = 0
+    strip_html = False
+    dropped_columns = set()
+
+    if file_format == 'anki':
+        headers, first_line, line_offset = _parse_anki_headers(lines)
+        lines = itertools.chain(first_line, lines)
+        separator = headers.get('separator', 'tab')
+        delimiter = ANKI_SEPARATORS.get(separator.lower(), separator[:1] or '\t')
+        strip_html = headers.get('html', 'false').lower() == 'true'
+        for key, value in headers.items():
+            if key.endswith(' column') and value.isdigit():
+                dropped_columns.add(int(value) - 1)
+
+    columns = list(range(len(HEADER_COLUMNS)))
+    reader = csv.reader(lines, delimiter=delimiter)
+    for row in reader:
+        if dropped_columns:
+            row = [value for index, value in enumerate(row) if index not in dropped_columns]
+        if strip_html:
+            row = [html.unescape(strip_tags(value)) for value in row]
+        row = [value.strip() for value in row]
+        if not any(row):
+            continue
+
+        if reader.line_num == 1 and file_format != 'anki':
+            names = [name.casefold() for name in row]
+            if set(HEADER_COLUMNS[:2]) <= set(names):
+                columns = [names.index(name) if name in names else None for name in HEADER_COLUMNS]
+                continue
+
+        values = [row[index] if index is not None and index < len(row) else '' for index in columns]
+        yield reader.line_num + line_offset, values
+
+
+def import_words(
+        words_list: WordsList,
+        lines: Iterable[str],
+        file_format: str,
+        chunk_size: int | None = None,
+        progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Imports words into a words list from a CSV, TSV or Anki text file.
+
+    Rows are parsed lazily and inserted with `bulk_create` in chunks of `chunk_size` words, each in its
+    own transaction, so memory stays constant however large the file is, and a failure only loses the
+    chunk being written. Words already in the list, including ones imported by earlier chunks, are
+    skipped as duplicates; each chunk looks them up with a single indexed query.
+
+    Args:
+        words_list (WordsList): The list to import the words into.
+        lines (Iterable[str]): The lines of the file, e.g. an open text file.
+        file_format (str): One of `IMPORT_FORMATS`.
+        chunk_size (int, optional): The number of rows per transaction. Defaults to `WORD_IMPORT['CHUNK_SIZE']`.
+        progress (Callable[[dict], None], optional): Called with the running totals after every chunk.
+
+    Returns:
+        dict: The number of `rows` read, words `created`, `duplicates` and `invalid` rows, and the `errors`
+            of the first invalid rows.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    config = get_word_import_config()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    max_lengths = {field: Word._meta.get_field(field).max_length for field in HEADER_COLUMNS}
+    totals = {'rows': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+
+    def report_invalid(line_number: int, message: str) -> None:
+        totals['invalid'] += 1
+        if len(totals['errors']) < config['MAX_REPORTED_ERRORS']:
+            totals['errors'].append(f"Line {line_number}: {message}")
+
+    rows = iter_import_rows(lines, file_format)
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        totals['rows'] += len(chunk)
+        words = {}
+
+        for line_number, (word, translation, pronunciation) in chunk:
+            if not word or not translation:
+                report_invalid(line_number, "Both the word and its translation are required.")
+                continue
+            too_long = [field for field, value in zip(HEADER_COLUMNS, (word, translation, pronunciation))
+                        if len(value) > max_lengths[field]]
+            if too_long:
+                field = too_long[0]
+                report_invalid(line_number, f"The {field} is longer than {max_lengths[field]} characters.")
+                continue
+            if word in words:
+                totals['duplicates'] += 1
+                continue
+            words[word] = Word(word=word, translation=translation, pronunciation=pronunciation or None,
+                               words_list=words_list)
+
+        with write_transaction():
+            existing = set(Word.objects.filter(words_list=words_list, word__in=list(words))
+                                       .values_list('word', flat=True))
+            new_words = [word for key, word in words.items() if key not in existing]
+            Word.objects.bulk_create(new_words)
+            if new_words:
+                bump_words_lists_version([words_list.id])
+
+        totals['duplicates'] += len(existing)
+        totals['created'] += len(new_words)
+        if progress is not None:
+            progress({key: value for key, value in totals.items() if key != 'errors'})
+
+    return totals
@@ -0,0 +1,135 @@
+import json
+import random
+import re
+import time
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import Any
+import httpx
+from django.utils.module_loading import import_string
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+from pydantic import PrivateAttr
+from .conf import get_app_settings
+
+DEFAULT_PROVIDER = {
+    'BACKEND': 'openai',
+    'OPTIONS': {},
+}
+
+PROVIDERS = {
+    'openai': 'vocab_app.llm_providers.create_openai_chat_model',
+    'fake': 'vocab_app.llm_providers.FakeStoryChatModel',
+}
+
+FAKE_WORDS_PATTERN = re.compile(r"following words: (.*?)\. The story must", re.DOTALL)
+FAKE_QUESTIONS_PATTERN = re.compile(r"create (\d+) statements")
+
+HTTP_CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
+@lru_cache(maxsize=None)
+def get_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Returns the keep-alive HTTP connection pools shared by every OpenAI chat model of the process,
+    created on first use so other providers don't open them.
+
+    Returns:
+        tuple[httpx.Client, httpx.AsyncClient]: The synchronous and asynchronous clients.
+    """
+    return httpx.Client(limits=HTTP_CLIENT_LIMITS), httpx.AsyncClient(limits=HTTP_CLIENT_LIMITS)
+
+
+def get_provider_config() -> dict:
+    """
+    Returns the configured LLM provider, `STORY_LLM_PROVIDER` from settings, or OpenAI when Django isn't configured.
+
+    Returns:
+        dict: The provider config with a `BACKEND` and its `OPTIONS`.
+    """
+    return get_app_settings('STORY_LLM_PROVIDER', DEFAULT_PROVIDER)
+
+
+def create_chat_model(model_name: str, temperature: float, max_tokens: int) -> BaseChatModel:
+    """
+    Creates a chat model with the configured provider.
+
+    `BACKEND` is either a name registered in `PROVIDERS` or the dotted path of a callable accepting
+    `model_name`, `temperature`, `max_tokens` and the provider `OPTIONS` as keyword arguments.
+
+    Returns:
+        BaseChatModel: The new chat model.
+    """
+    config = get_provider_config()
+    factory = import_string(PROVIDERS.get(config['BACKEND'], config['BACKEND']))
+    return factory(model_name=model_name, temperature=temperature, max_tokens=max_tokens, **config['OPTIONS'])
+
+
+def create_openai_chat_model(model_name: str, temperature: float, max_tokens: int, **options) -> ChatOpenAI:
+    """
+    Creates an OpenAI chat model using the shared keep-alive HTTP connection pools.
+    """
+    http_client, http_async_client = get_http_clients()
+    return ChatOpenAI(
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **options,
+    )
+
+
+class FakeStoryChatModel(BaseChatModel):
+    """
+    A deterministic local stand-in for the story model, for tests and load testing without an API key.
+
+    It answers story prompts with valid story/questions/answers JSON built from the requested words,
+    and can simulate the model's latency and random failures.
+    """
+    model_name: str = "fake-story-model"
+    temperature: float = 0.0
+    max_tokens: int = 1000
+    latency: float = 0.0
+    failure_rate: float = 0.0
+    stream_chunk_size: int = 20
+    seed: int | None = None
+
+    _random: random.Random | None = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-story"
+
+    def _build_response(self, messages: list[BaseMessage]) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        if self._random is None:
+            self._random = random.Random(self.seed)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise RuntimeError("Injected failure of the fake story model.")
+
+        prompt = "\n".join(str(message.content) for message in messages)
+        words_match = FAKE_WORDS_PATTERN.search(prompt)
+        words = words_match.group(1).split("|") if words_match else ["story"]
+        questions_match = FAKE_QUESTIONS_PATTERN.search(prompt)
+        questions_count = int(questions_match.group(1)) if questions_match else 3
+
+        questions = [f"The story mentions '{words[index % len(words)]}'." for index in range(questions_count)]
+        return json.dumps({
+            "story": "".join(f"<p>This sentence uses the word {word}.</p>" for word in words),
+            "questions": "\n".join(f"{number}. {question}" for number, question in enumerate(questions, start=1)),
+            "answers": "\n".join(f"{number}. R" for number in range(1, questions_count + 1)),
+        })
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None,
+                  **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._build_response(messages)))])
+
+    def _stream(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        content = self._build_response(messages)
+        for start in range(0, len(content), self.stream_chunk_size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[start:start + self.stream_chunk_size]))
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from vocab_app.exporter import export_words, get_word_export_config, EXPORT_FORMATS
+from vocab_app.models import Word
+
+
+class Command(BaseCommand):
+    help = "Dumps all words lists of a user as a CSV or JSON Lines file, streamed in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='The owner of the words lists.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help='The file format.')
+        parser.add_argument('--output', help='The file to write. Defaults to the standard output.')
+        parser.add_argument('--chunk-size', type=int, default=get_word_export_config()['CHUNK_SIZE'],
+                            help='The number of rows fetched from the database at a time.')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        chunks = export_words(Word.objects.filter(words_list__user=user), options['format'], options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        try:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        except OSError as e:
+            raise CommandError(f"Can't write {options['output']}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Exported the words lists of {user.username} to {options['output']}."))
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from vocab_app.importer import get_word_import_config, guess_import_format, import_words, IMPORT_FORMATS
+from vocab_app.models import WordsList
+
+
+class Command(BaseCommand):
+    help = 'Imports words from a CSV, TSV or Anki text file into a words list, in chunks of constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='The owner of the words list.')
+        parser.add_argument('words_list', help='The id or name of the words list; a missing name is created.')
+        parser.add_argument('path', help='The file to import.')
+        parser.add_argument('--format', choices=list(IMPORT_FORMATS),
+                            help='The file format. Guessed from the file extension by default.')
+        parser.add_argument('--chunk-size', type=int, default=get_word_import_config()['CHUNK_SIZE'],
+                            help='The number of rows inserted per transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        words_list_name = options['words_list']
+        if words_list_name.isdigit():
+            try:
+                words_list = WordsList.objects.get(id=int(words_list_name), user=user)
+            except WordsList.DoesNotExist:
+                raise CommandError(f"Words list {words_list_name} does not exist or doesn't belong to the user.")
+        else:
+            # List names aren't unique, so a name shared by several lists has to be given as an id instead
+            words_lists = list(WordsList.objects.filter(name=words_list_name, user=user).order_by('id')[:2])
+            if len(words_lists) > 1:
+                raise CommandError(f"The user has several words lists named '{words_list_name}'; pass its id instead.")
+            words_list = words_lists[0] if words_lists else WordsList.objects.create(name=words_list_name, user=user)
+
+        file_format = options['format'] or guess_import_format(options['path'])
+
+        def report_progress(totals):
+            self.stdout.write(f"{totals['rows']} rows read: {totals['created']} created, "
+                              f"{totals['duplicates']} duplicates, {totals['invalid']} invalid.")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', errors='replace', newline='') as lines:
+                totals = import_words(words_list, lines, file_format, options['chunk_size'], report_progress)
+        except OSError as e:
+            raise CommandError(f"Can't read {options['path']}: {e}")
+
+        for error in totals['errors']:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['created']} words into '{words_list.name}' ({totals['duplicates']} duplicates, "
+            f"{totals['invalid']} invalid rows skipped)."
+        ))
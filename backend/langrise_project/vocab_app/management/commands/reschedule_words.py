@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from vocab_app.db import write_transaction
+from vocab_app.models import Word, WordsList
+from vocab_app.scheduler import shift_reviews, spread_overdue_reviews
+from vocab_app.utils import bump_words_lists_version
+
+
+class Command(BaseCommand):
+    help = "Shifts or spreads the reviews of a user's words with single UPDATE statements, e.g. after a vacation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='The owner of the words.')
+        mode = parser.add_mutually_exclusive_group(required=True)
+        mode.add_argument('--shift', type=int, metavar='DAYS',
+                          help='Postpone every scheduled review by this many days.')
+        mode.add_argument('--spread', type=int, metavar='DAYS',
+                          help='Spread the overdue words evenly over this many days.')
+        parser.add_argument('--words-list', type=int, help='Only reschedule the words of this list.')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        days = options['shift'] if options['shift'] is not None else options['spread']
+        if days < 1:
+            raise CommandError("The number of days must be positive.")
+
+        words_lists = WordsList.objects.filter(user=user)
+        if options['words_list'] is not None:
+            words_lists = words_lists.filter(id=options['words_list'])
+        words_list_ids = list(words_lists.values_list('id', flat=True))
+        if options['words_list'] is not None and not words_list_ids:
+            raise CommandError(f"Words list {options['words_list']} does not exist or doesn't belong to the user.")
+
+        reschedule = shift_reviews if options['shift'] is not None else spread_overdue_reviews
+        with write_transaction():
+            rescheduled = reschedule(Word.objects.filter(words_list__in=words_list_ids), days)
+            if rescheduled:
+                bump_words_lists_version(words_list_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Rescheduled {rescheduled} words of {user.username}."))
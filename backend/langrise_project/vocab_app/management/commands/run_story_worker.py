@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import django
+from django.core.management.base import BaseCommand
+from vocab_app.story_jobs import claim_pending_jobs, get_story_worker_config, process_story_job
+
+
+class Command(BaseCommand):
+    help = 'Runs queued story generation jobs in a thread or process pool.'
+
+    def add_arguments(self, parser):
+        config = get_story_worker_config()
+        parser.add_argument('--executor', choices=['thread', 'process'], default=config['EXECUTOR'],
+                            help='Run the jobs in threads or in separate processes.')
+        parser.add_argument('--workers', type=int, default=config['WORKERS'],
+                            help='The number of jobs generated concurrently.')
+        parser.add_argument('--poll-interval', type=float, default=config['POLL_INTERVAL'],
+                            help='Seconds to wait between checks for new jobs when the queue is empty.')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit as soon as the queue is empty instead of waiting for new jobs.')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+
+        if options['executor'] == 'process':
+            # Spawned processes open their own database connections instead of inheriting the parent's
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=django.setup)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+        self.stdout.write(f"Story worker started with {workers} {options['executor']} workers.")
+        running = set()
+
+        with executor:
+            try:
+                while True:
+                    if len(running) < workers:
+                        for job_id in claim_pending_jobs(workers - len(running)):
+                            running.add(executor.submit(process_story_job, job_id))
+
+                    if running:
+                        done, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                        for future in done:
+                            try:
+                                self.stdout.write(f"Story job finished: {future.result()}.")
+                            except Exception as e:
+                                self.stderr.write(f"Story job crashed: {e}")
+                    elif options['once']:
+                        break
+                    else:
+                        time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping the story worker...")
+
+        self.stdout.write(self.style.SUCCESS("Story worker stopped."))
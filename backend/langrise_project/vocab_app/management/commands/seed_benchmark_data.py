@@ -0,0 +1,74 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+from vocab_app.db import write_transaction
+from vocab_app.models import Word, WordsList
+
+
+class Command(BaseCommand):
+    help = 'Seeds users x lists x words of benchmark data with batched inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='The number of users.')
+        parser.add_argument('--lists', type=int, default=5, help='The number of words lists per user.')
+        parser.add_argument('--words', type=int, default=1000, help='The number of words per list.')
+        parser.add_argument('--prefix', default='bench', help='The prefix of the usernames; also their password.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='The number of rows per INSERT batch.')
+        parser.add_argument('--seed', type=int, default=0, help='The seed of the random review states.')
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        prefix = options['prefix']
+        usernames = [f"{prefix}{index}" for index in range(options['users'])]
+        if user_model.objects.filter(username__in=usernames).exists():
+            raise CommandError(f"Users named '{prefix}<n>' already exist; pick another --prefix.")
+
+        start = time.perf_counter()
+        # Hashing is deliberately slow, so every user shares one hash
+        password = make_password(prefix)
+
+        with write_transaction():
+            users = user_model.objects.bulk_create(
+                [user_model(username=username, password=password) for username in usernames],
+                batch_size=options['batch_size'],
+            )
+            words_lists = WordsList.objects.bulk_create(
+                [WordsList(name=f"List {index}", user=user) for user in users for index in range(options['lists'])],
+                batch_size=options['batch_size'],
+            )
+
+        # Words are generated lazily and committed batch by batch, so memory doesn't grow with the dataset
+        words = self._generate_words(words_lists, options['words'], random.Random(options['seed']))
+        created = 0
+        while batch := list(itertools.islice(words, options['batch_size'])):
+            with write_transaction():
+                Word.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(users)} users, {len(words_lists)} words lists and {created} words "
+            f"in {time.perf_counter() - start:.1f}s."
+        ))
+
+    @staticmethod
+    def _generate_words(words_lists, words_per_list: int, rng: random.Random):
+        # A realistic mix of review states: new words, overdue words and words scheduled in the coming weeks
+        date_now = now()
+        for words_list in words_lists:
+            for index in range(words_per_list):
+                word = Word(word=f"word{index}", translation=f"translation{index}", pronunciation=f"/wɜːd{index}/",
+                            words_list=words_list)
+                state = rng.random()
+                if state >= 0.2:
+                    word.interval = rng.randint(1, 60)
+                    word.easiness = round(rng.uniform(1.3, 2.8), 2)
+                    word.repetitions = rng.randint(1, 8)
+                    due_in_days = rng.randint(-10, -1) if state < 0.5 else rng.randint(1, word.interval)
+                    word.next_review = date_now + timedelta(days=due_in_days)
+                    word.last_reviewed = word.next_review - timedelta(days=word.interval)
+                yield word
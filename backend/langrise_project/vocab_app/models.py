@@ -14,6 +14,14 @@ class Word(models.Model):
     easiness = models.FloatField(null=True, blank=True)
     repetitions = models.IntegerField(null=True, blank=True)
     words_list = models.ForeignKey('WordsList', on_delete=models.CASCADE)
+    # Also set explicitly by bulk_update and update() calls, which skip auto_now
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['words_list', 'next_review'], name='word_list_next_review_idx'),
+            models.Index(fields=['words_list', 'word'], name='word_list_word_idx'),
+        ]
 
     def __str__(self):
         return self.word
@@ -23,6 +31,113 @@ class WordsList(models.Model):
     name = models.CharField(max_length=100)
     date_created = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Bumped on every change of the list or its words, for the ETags of the list endpoints
+    version = models.PositiveIntegerField(default=0)
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
+
+
+class UserSettings(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='settings')
+    cache_stories = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"Settings of {self.user}"
+
+
+class StoryCacheEntry(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    result = models.JSONField()
+    date_created = models.DateTimeField(auto_now_add=True)
+    last_accessed = models.DateTimeField(db_index=True)
+    hits = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.key
+
+
+class StoryCacheStats(models.Model):
+    hits = models.IntegerField(default=0)
+    misses = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+class StoryJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    words = models.JSONField()
+    language_level = models.CharField(max_length=10)
+    tone = models.CharField(max_length=100)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_started = models.DateTimeField(null=True, blank=True)
+    date_finished = models.DateTimeField(null=True, blank=True)
+    # Lease of the worker running the job; running jobs whose lease expired are claimed again
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'date_created'], name='story_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Story job {self.pk} ({self.status})"
+
+
+# Append-only log of every review, kept when the word is deleted
+class ReviewEvent(models.Model):
+    word = models.ForeignKey(Word, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    reviewed_at = models.DateTimeField()
+    quality = models.SmallIntegerField()
+    game_type = models.CharField(max_length=20)
+    previous_interval = models.IntegerField(null=True, blank=True)
+    next_interval = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['word', 'reviewed_at'], name='review_event_word_idx'),
+            models.Index(fields=['reviewed_at'], name='review_event_reviewed_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"Review of word {self.word_id} at {self.reviewed_at}"
+
+
+# Records deleted words and words lists for the delta sync
+class Tombstone(models.Model):
+    WORD = 'word'
+    WORDS_LIST = 'words_list'
+    KIND_CHOICES = [
+        (WORD, 'Word'),
+        (WORDS_LIST, 'Words list'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id}"
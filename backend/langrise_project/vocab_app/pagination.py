@@ -0,0 +1,34 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by id, so every page is an index range scan no matter how deep it is.
+
+    Pagination is opt-in: responses stay plain lists unless the request has a `page_size` or a `cursor`
+    query parameter. The total count costs an extra COUNT query and is only sent with `count=true`.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_query_param = 'count'
+
+    def get_page_size(self, request):
+        if self.page_size_query_param not in request.query_params and \
+                self.cursor_query_param not in request.query_params:
+            return None
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response_data = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            response_data = {'count': self.count, **response_data}
+        return Response(response_data)
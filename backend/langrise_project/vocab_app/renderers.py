@@ -0,0 +1,77 @@
+import csv
+import io
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Datetimes in UTC end with 'Z', like the ones formatted by DRF's DateTimeField
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    A JSON renderer based on orjson. Datetimes, dates, UUIDs and dataclasses are serialized natively;
+    other types (decimals, lazy translations...) fall back to DRF's JSON encoder.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+
+
+class ORJSONParser(BaseParser):
+    """
+    A JSON parser based on orjson.
+    """
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f"JSON parse error - {e}")
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renders a list of flat objects, or a single one such as an error, as CSV with a header row.
+    Large exports are streamed by `exporter.export_words` instead; this renderer mainly lets the
+    `csv` format be negotiated.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        columns = list(rows[0]) if rows else []
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        writer.writerows([row.get(column) for column in columns] for row in rows)
+        return output.getvalue().encode()
+
+
+class JSONLinesRenderer(BaseRenderer):
+    """
+    Renders a list of objects, or a single one such as an error, as JSON Lines, one object per line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(orjson.dumps(row, default=JSONEncoder().default, option=ORJSON_OPTIONS) + b'\n'
+                        for row in rows)
@@ -0,0 +1,114 @@
+import atexit
+import logging
+import threading
+from django.db import connection, transaction
+from .conf import get_app_settings
+from .models import ReviewEvent
+
+REVIEW_LOG_DEFAULTS = {
+    # Buffer the events in the process and insert them in batches instead of with every review request
+    'BUFFERED': False,
+    'FLUSH_EVENTS': 500,
+    'FLUSH_INTERVAL_MS': 1000,
+    'BATCH_SIZE': 1000,
+}
+
+
+def get_review_log_config() -> dict:
+    return get_app_settings('REVIEW_LOG', REVIEW_LOG_DEFAULTS)
+
+
+class ReviewEventBuffer:
+    def __init__(self, flush_events: int, flush_interval_ms: int, batch_size: int):
+        """
+        Initializes an in-process buffer of review events, inserted with `bulk_create` once `flush_events`
+        events are waiting or the oldest one has waited `flush_interval_ms` milliseconds.
+
+        Events still buffered when the process crashes are lost; the buffer is flushed at a normal exit.
+
+        Args:
+            flush_events (int): The number of buffered events that triggers a flush.
+            flush_interval_ms (int): The longest time an event stays in the buffer.
+            batch_size (int): The number of rows per INSERT.
+        """
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self._events = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, events: list[ReviewEvent]) -> None:
+        """
+        Buffers events, flushing the buffer when it is full.
+        """
+        with self._lock:
+            self._events.extend(events)
+            full = len(self._events) >= self.flush_events
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Inserts every buffered event.
+
+        Returns:
+            int: The number of inserted events.
+        """
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if events:
+            ReviewEvent.objects.bulk_create(events, batch_size=self.batch_size)
+        return len(events)
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"Failed to flush the review events: {e}")
+        finally:
+            # The timer thread has its own database connection
+            connection.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_review_event_buffer() -> ReviewEventBuffer:
+    """
+    Returns the review event buffer of the process, creating it on first use.
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            config = get_review_log_config()
+            _buffer = ReviewEventBuffer(config['FLUSH_EVENTS'], config['FLUSH_INTERVAL_MS'], config['BATCH_SIZE'])
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def log_review_events(events: list[ReviewEvent]) -> None:
+    """
+    Records review events. Without buffering they are inserted at once, in the current transaction;
+    with `REVIEW_LOG['BUFFERED']` they are handed to the buffer once the current transaction commits.
+
+    Args:
+        events (list[ReviewEvent]): The unsaved events.
+    """
+    config = get_review_log_config()
+    if not events:
+        return
+    if config['BUFFERED']:
+        buffer = get_review_event_buffer()
+        transaction.on_commit(lambda: buffer.add(events))
+    else:
+        ReviewEvent.objects.bulk_create(events, batch_size=config['BATCH_SIZE'])
@@ -0,0 +1,132 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+import numpy as np
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F, QuerySet, Value
+from django.utils.timezone import now
+from .models import Word
+
+FIRST_REVIEW_EASINESS = 2.5
+MIN_EASINESS = 1.3
+
+
+def schedule_reviews(
+        easiness: np.ndarray,
+        interval: np.ndarray,
+        repetitions: np.ndarray,
+        quality: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the next SuperMemo2 schedule for many words in one vectorized pass.
+
+    The arithmetic mirrors `supermemo2.review` step by step (in the same order and in
+    double precision), so the results are identical to calling it once per word.
+    Words reviewed for the first time are expected to be passed with an easiness of
+    2.5 and zero interval and repetitions, as `supermemo2.first_review` does.
+
+    :param easiness: The current easiness factors.
+    :param interval: The current intervals in days.
+    :param repetitions: The current numbers of consecutive successful repetitions.
+    :param quality: The review quality ratings (0-5).
+    :return: A tuple of (easiness, interval, repetitions) arrays after the review.
+    """
+    easiness = np.asarray(easiness, dtype=np.float64)
+    interval = np.asarray(interval, dtype=np.int64)
+    repetitions = np.asarray(repetitions, dtype=np.int64)
+    quality = np.asarray(quality, dtype=np.int64)
+
+    passed = quality >= 3
+    grown_interval = np.ceil(interval * easiness).astype(np.int64)
+    new_interval = np.where(
+        passed & (repetitions > 1), grown_interval, np.where(passed & (repetitions == 1), 6, 1)
+    )
+    new_repetitions = np.where(passed, repetitions + 1, 0)
+
+    lapse = 5 - quality
+    new_easiness = easiness + (0.1 - lapse * (0.08 + lapse * 0.02))
+    new_easiness = np.where(new_easiness < MIN_EASINESS, MIN_EASINESS, new_easiness)
+
+    return new_easiness, new_interval, new_repetitions
+
+
+def update_words_repetition(reviews: list[tuple[Word, int]], review_datetime: datetime | None = None) -> list[datetime]:
+    """
+    Applies many review ratings to words in memory using the vectorized scheduler.
+
+    Reviews are applied in order: if the same word is rated several times, each rating
+    sees the state left by the previous one, exactly as repeated calls to
+    `update_word_repetition` would. Nothing is saved; persist the words with
+    `bulk_update` afterwards.
+
+    :param reviews: A list of (word, rating) pairs.
+    :param review_datetime: The time of the review. Defaults to now.
+    :return: The next review date resulting from each review, in the order of `reviews`.
+    """
+    review_datetime = review_datetime or now()
+    next_reviews = [None] * len(reviews)
+
+    # Split the reviews into rounds so that every word appears at most once per round
+    rounds = defaultdict(list)
+    occurrences = defaultdict(int)
+    for index, (word, _) in enumerate(reviews):
+        rounds[occurrences[id(word)]].append(index)
+        occurrences[id(word)] += 1
+
+    deltas = {}
+    for round_indexes in rounds.values():
+        words = [reviews[index][0] for index in round_indexes]
+        reviewed = [word.last_reviewed is not None for word in words]
+
+        easiness, interval, repetitions = schedule_reviews(
+            easiness=[word.easiness if was_reviewed else FIRST_REVIEW_EASINESS
+                      for word, was_reviewed in zip(words, reviewed)],
+            interval=[word.interval if was_reviewed else 0 for word, was_reviewed in zip(words, reviewed)],
+            repetitions=[word.repetitions if was_reviewed else 0 for word, was_reviewed in zip(words, reviewed)],
+            quality=[reviews[index][1] for index in round_indexes],
+        )
+
+        for index, word, new_easiness, new_interval, new_repetitions in zip(
+                round_indexes, words, easiness.tolist(), interval.tolist(), repetitions.tolist()):
+            if new_interval not in deltas:
+                deltas[new_interval] = timedelta(days=new_interval)
+            word.last_reviewed = review_datetime
+            word.next_review = review_datetime + deltas[new_interval]
+            word.interval = new_interval
+            word.easiness = new_easiness
+            word.repetitions = new_repetitions
+            next_reviews[index] = word.next_review
+
+    return next_reviews
+
+
+def shift_reviews(words: QuerySet, days: int) -> int:
+    """
+    Postpones the next review of every scheduled word by a number of days with a single UPDATE,
+    keeping the spacing between reviews. Never-reviewed words are left alone. No word is loaded.
+
+    :param words: The words to reschedule.
+    :param days: The number of days to postpone the reviews by.
+    :return: The number of rescheduled words.
+    """
+    return words.filter(next_review__isnull=False).update(
+        next_review=F('next_review') + timedelta(days=days),
+        modified_at=now(),
+    )
+
+
+def spread_overdue_reviews(words: QuerySet, days: int, start: datetime | None = None) -> int:
+    """
+    Spreads the overdue words evenly over the next `days` days with a single UPDATE, so a backlog of
+    reviews is worked through a few a day. Words are assigned a day by their id, so the spreading is
+    stable and no word is loaded.
+
+    :param words: The words to reschedule.
+    :param days: The length of the window, in days, starting at `start`.
+    :param start: The start of the window. Defaults to now.
+    :return: The number of rescheduled words.
+    """
+    start = start or now()
+    day_offset = ExpressionWrapper(Value(timedelta(days=1)) * (F('id') % days), output_field=DurationField())
+    return words.filter(next_review__lte=start).update(
+        next_review=Value(start, output_field=DateTimeField()) + day_offset,
+        modified_at=start,
+    )
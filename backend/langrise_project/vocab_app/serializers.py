@@ -1,6 +1,7 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from .models import Word, WordsList
+from .models import Word, WordsList, UserSettings
+from .utils import parse_id
 from django.contrib.auth.password_validation import validate_password
 
 
@@ -25,29 +26,91 @@ class RegisterSerializer(serializers.ModelSerializer):
 
 
 class CurrentUserSerializer(serializers.ModelSerializer):
+    cache_stories = serializers.BooleanField(source='settings.cache_stories', required=False)
+
     class Meta:
         model = User
-        fields = ['username', 'email', 'password']
+        fields = ['username', 'email', 'password', 'cache_stories']
         extra_kwargs = {
             'password': {'write_only': True, 'required': False},
         }
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Users without stored settings keep the defaults
+        if data.get('cache_stories') is None:
+            data['cache_stories'] = UserSettings._meta.get_field('cache_stories').default
+        return data
+
     def update(self, instance, validated_data):
         password = validated_data.pop('password', None)
+        user_settings = validated_data.pop('settings', None)
         instance = super().update(instance, validated_data)
         if password:
             instance.set_password(password)
             instance.save()
+        if user_settings:
+            UserSettings.objects.update_or_create(user=instance, defaults=user_settings)
         return instance
 
 
-class WordSerializer(serializers.ModelSerializer):
+class SparseFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    A model serializer that can be limited to a subset of its fields with the `fields` keyword argument.
+    """
+    def __init__(self, *args, fields: list[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class WordsListPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    A primary key field that first looks the words list up among the ones already
+    resolved by `WordListSerializer`, so validating many words doesn't query it per word.
+    """
+    def to_internal_value(self, data):
+        resolved = getattr(self, 'resolved', {})
+        if str(data) in resolved:
+            return resolved[str(data)]
+        return super().to_internal_value(data)
+
+
+class WordListSerializer(serializers.ListSerializer):
+    bulk_create_batch_size = 1000
+
+    def to_internal_value(self, data):
+        # Resolve every referenced words list with a single query before validating the items
+        if isinstance(data, list):
+            words_list_field = self.child.fields['words_list']
+            words_list_ids = {parse_id(item.get('words_list')) for item in data if isinstance(item, dict)}
+            words_list_ids.discard(None)
+            words_lists = words_list_field.get_queryset().in_bulk(words_list_ids)
+            words_list_field.resolved = {str(pk): words_list for pk, words_list in words_lists.items()}
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        words = [Word(**attrs) for attrs in validated_data]
+        return Word.objects.bulk_create(words, batch_size=self.bulk_create_batch_size)
+
+
+class WordSerializer(SparseFieldsModelSerializer):
+    words_list = WordsListPrimaryKeyField(queryset=WordsList.objects.all())
+
     class Meta:
         model = Word
         fields = '__all__'
+        list_serializer_class = WordListSerializer
+
 
+class WordsListSerializer(SparseFieldsModelSerializer):
+    # Annotated by `utils.annotate_word_counts`
+    word_count = serializers.IntegerField(read_only=True)
+    due_count = serializers.IntegerField(read_only=True)
+    new_count = serializers.IntegerField(read_only=True)
+    mastered_count = serializers.IntegerField(read_only=True)
 
-class WordsListSerializer(serializers.ModelSerializer):
     class Meta:
         model = WordsList
-        fields = ['id', 'name', 'date_created', 'user']
\ No newline at end of file
+        fields = ['id', 'name', 'date_created', 'user', 'word_count', 'due_count', 'new_count', 'mastered_count']
\ No newline at end of file
@@ -0,0 +1,289 @@
+import unicodedata
+from collections.abc import Iterable
+from functools import lru_cache
+
+# (minimum similarity, grade) pairs, from the highest grade down
+GRADE_THRESHOLDS = [
+    (0.96, 5),
+    (0.88, 4),
+    (0.75, 3),
+    (0.6, 2),
+    (0.45, 1),
+]
+MIN_GRADED_SIMILARITY = GRADE_THRESHOLDS[-1][0]
+
+# Letters that Unicode doesn't decompose into a base letter and an accent
+SPECIAL_LETTERS = str.maketrans({
+    'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ø': 'o', 'Ø': 'O', 'ħ': 'h', 'Ħ': 'H', 'ı': 'i',
+})
+
+INSERTION_COST = 1
+SUBSTITUTION_COST = 2
+TRANSPOSITION_COST = 1
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Normalizes a word or phrase for grading: strips accents, applies Unicode case folding
+    and collapses whitespace.
+
+    :param text: The word or phrase to normalize.
+    :return: The normalized text.
+    """
+    if text.isascii():
+        return ' '.join(text.casefold().split())
+    decomposed = unicodedata.normalize('NFKD', text.translate(SPECIAL_LETTERS))
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.casefold().split())
+
+
+def _character_masks(text: str) -> dict[str, int]:
+    masks = {}
+    for position, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def indel_distance(first: str, second: str) -> int:
+    """
+    Computes the insertion/deletion distance between two strings, `len(first) + len(second) - 2 * LCS`,
+    with the bit-parallel longest common subsequence algorithm, which processes a whole row of the
+    dynamic programming table with a few integer operations.
+
+    :param first: The first string.
+    :param second: The second string.
+    :return: The distance.
+    """
+    masks = _character_masks(first)
+    all_ones = (1 << len(first)) - 1
+    row = all_ones
+    for char in second:
+        matches = row & masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & all_ones
+    common_length = len(first) - row.bit_count()
+    return len(first) + len(second) - 2 * common_length
+
+
+def count_transpositions(first: str, second: str, max_offset: int) -> int:
+    """
+    Counts the disjoint pairs of adjacent characters of `first` that appear swapped in `second` at most
+    `max_offset` positions away. An alignment costing at most `max_offset` can't shift a character any
+    further and its transpositions don't overlap, so if the weighted Damerau-Levenshtein distance is at
+    most `max_offset`, it lies between `indel_distance - count_transpositions` and `indel_distance`.
+
+    :param first: The first string.
+    :param second: The second string.
+    :param max_offset: The largest distance of interest.
+    :return: The number of swapped pairs.
+    """
+    count = 0
+    position = 0
+    while position < len(first) - 1:
+        pair = first[position + 1] + first[position]
+        if pair[0] != pair[1] and second.find(pair, max(0, position - max_offset), position + max_offset + 2) >= 0:
+            count += 1
+            position += 2
+        else:
+            position += 1
+    return count
+
+
+def bounded_edit_distance(first: str, second: str, max_distance: int) -> int | None:
+    """
+    Computes the weighted Damerau-Levenshtein (optimal string alignment) distance between two strings,
+    giving up as soon as it is certain to exceed `max_distance`.
+
+    Insertions and deletions cost 1, substitutions 2 and transpositions of adjacent characters 1, so that
+    without transpositions the distance matches the one behind `difflib.SequenceMatcher.ratio`. Only the
+    diagonal band of width `max_distance` is computed.
+
+    :param first: The first string.
+    :param second: The second string.
+    :param max_distance: The largest distance of interest.
+    :return: The distance, or None if it is larger than `max_distance`.
+    """
+    first_length, second_length = len(first), len(second)
+    if abs(first_length - second_length) > max_distance:
+        return None
+
+    out_of_bound = max_distance + 1
+    previous_previous_row = None
+    previous_row = [j if j <= max_distance else out_of_bound for j in range(second_length + 1)]
+
+    for i in range(1, first_length + 1):
+        row = [out_of_bound] * (second_length + 1)
+        row[0] = i if i <= max_distance else out_of_bound
+        row_min = row[0]
+        first_char = first[i - 1]
+
+        for j in range(max(1, i - max_distance), min(second_length, i + max_distance) + 1):
+            second_char = second[j - 1]
+            if first_char == second_char:
+                distance = previous_row[j - 1]
+            else:
+                distance = previous_row[j - 1] + SUBSTITUTION_COST
+                if i > 1 and j > 1 and first_char == second[j - 2] and first[i - 2] == second_char:
+                    distance = min(distance, previous_previous_row[j - 2] + TRANSPOSITION_COST)
+            distance = min(distance, previous_row[j] + INSERTION_COST, row[j - 1] + INSERTION_COST)
+
+            row[j] = distance if distance <= max_distance else out_of_bound
+            if row[j] < row_min:
+                row_min = row[j]
+
+        # No alignment can get back under the bound once a whole row is above it
+        if row_min > max_distance:
+            return None
+        previous_previous_row, previous_row = previous_row, row
+
+    distance = previous_row[second_length]
+    return distance if distance <= max_distance else None
+
+
+def _max_distance(min_similarity: float, total_length: int) -> int:
+    """
+    Returns the largest distance whose similarity `1 - distance / total_length` is at least `min_similarity`,
+    computed with the same floating point operations as the grading, or -1 if there is none.
+    """
+    max_distance = int((1 - min_similarity) * total_length)
+    while 1 - (max_distance + 1) / total_length >= min_similarity:
+        max_distance += 1
+    while max_distance >= 0 and 1 - max_distance / total_length < min_similarity:
+        max_distance -= 1
+    return max_distance
+
+
+def _distance_bounds(original: str, user_input: str) -> tuple[int, int, int] | None:
+    """
+    Returns a lower and the upper bound of the distance between two normalized answers and their total length,
+    or None if the answer is certainly too different to earn any grade. The lower bound only uses the fact that
+    every transposition saves one edit and costs one, so at most half of the `indel_distance` can be saved;
+    `_transposition_bound` tightens it.
+    """
+    total_length = len(original) + len(user_input)
+    max_distance = _max_distance(MIN_GRADED_SIMILARITY, total_length)
+    if abs(len(original) - len(user_input)) > max_distance:
+        return None
+
+    distance = indel_distance(original, user_input)
+    lower_bound = (distance + 1) // 2
+    if lower_bound > max_distance:
+        return None
+    return lower_bound, distance, total_length
+
+
+def _transposition_bound(original: str, user_input: str, distance: int, total_length: int) -> int:
+    """
+    Returns the lower bound of the distance given by the swapped pairs the answer could have, which is
+    only valid for distances that can still earn a grade.
+    """
+    max_offset = min(distance, _max_distance(MIN_GRADED_SIMILARITY, total_length))
+    return max((distance + 1) // 2, distance - count_transpositions(original, user_input, max_offset))
+
+
+def _exact_similarity(original: str, user_input: str) -> float:
+    if original == user_input:
+        return 1.0
+    bounds = _distance_bounds(original, user_input)
+    if bounds is None:
+        return 0.0
+
+    lower_bound, distance, total_length = bounds
+    if lower_bound < distance:
+        lower_bound = _transposition_bound(original, user_input, distance, total_length)
+    max_distance = min(distance, _max_distance(MIN_GRADED_SIMILARITY, total_length))
+    if lower_bound > max_distance:
+        return 0.0
+    if lower_bound < distance:
+        swapped_distance = bounded_edit_distance(original, user_input, max_distance)
+        if swapped_distance is not None:
+            distance = swapped_distance
+
+    similarity = 1 - distance / total_length
+    return similarity if similarity >= MIN_GRADED_SIMILARITY else 0.0
+
+
+def answer_similarity(original: str, user_input: str) -> float:
+    """
+    Computes how similar a typed answer is to the original word, after normalizing both.
+
+    The similarity is `1 - distance / (len(original) + len(user_input))`, which ranges from 0 to 1 like
+    difflib's ratio. Anything below the lowest grade threshold gets 0.0, since it can't earn any points.
+    The bit-parallel `indel_distance` settles most pairs; the banded `bounded_edit_distance` only runs
+    when swapped letters could lower it. The exact ratio takes a wider band than a grade, which makes this
+    slower than difflib on long phrases; grading should go through `answer_grade`.
+
+    :param original: The original word or phrase.
+    :param user_input: The word or phrase typed by the user.
+    :return: The similarity, where 1 denotes identical inputs.
+    """
+    return _exact_similarity(normalize_answer(original), normalize_answer(user_input))
+
+
+@lru_cache(maxsize=8192)
+def answer_grade(original: str, user_input: str) -> int:
+    """
+    Grades a typed answer, equivalent to `grade_similarity(answer_similarity(original, user_input))`.
+
+    The exact distance is only computed when its lower and upper bounds fall under different grade
+    thresholds, and then only in the band that could reach the next threshold, exiting as soon as a row
+    leaves it. Answers seen for the first time are graded 1.5-4x faster than with difflib; the results
+    are memoized for the answers a review session repeats.
+
+    :param original: The original word or phrase.
+    :param user_input: The word or phrase typed by the user.
+    :return: The grade, from 0 to 5.
+    """
+    original, user_input = normalize_answer(original), normalize_answer(user_input)
+    if original == user_input:
+        return grade_similarity(1.0)
+    bounds = _distance_bounds(original, user_input)
+    if bounds is None:
+        return 0
+
+    lower_bound, distance, total_length = bounds
+    lowest_grade = grade_similarity(1 - distance / total_length)
+    if grade_similarity(1 - lower_bound / total_length) == lowest_grade:
+        return lowest_grade
+    lower_bound = _transposition_bound(original, user_input, distance, total_length)
+    if grade_similarity(1 - lower_bound / total_length) == lowest_grade:
+        return lowest_grade
+
+    # Only a distance earning a higher grade matters, so the band stops at the next threshold
+    next_threshold = min(threshold for threshold, grade in GRADE_THRESHOLDS if grade > lowest_grade)
+    exact_distance = bounded_edit_distance(original, user_input, _max_distance(next_threshold, total_length))
+    if exact_distance is None:
+        return lowest_grade
+    return grade_similarity(1 - exact_distance / total_length)
+
+
+def grade_similarity(similarity_ratio: float) -> int:
+    """
+    Maps a similarity ratio to a grade from 0 to 5 using `GRADE_THRESHOLDS`.
+
+    :param similarity_ratio: The similarity, between 0 and 1.
+    :return: The grade.
+    """
+    for threshold, grade in GRADE_THRESHOLDS:
+        if similarity_ratio >= threshold:
+            return grade
+    return 0
+
+
+def compare_answers(pairs: Iterable[tuple[str, str]]) -> list[float]:
+    """
+    Computes the similarity of many (original, user_input) pairs in one call.
+
+    :param pairs: The (original, user_input) pairs.
+    :return: The similarity of each pair, in order.
+    """
+    return [answer_similarity(original, user_input) for original, user_input in pairs]
+
+
+def grade_answers(pairs: Iterable[tuple[str, str]]) -> list[int]:
+    """
+    Grades many (original, user_input) pairs in one call.
+
+    :param pairs: The (original, user_input) pairs.
+    :return: The grade of each pair, in order.
+    """
+    return [answer_grade(original, user_input) for original, user_input in pairs]
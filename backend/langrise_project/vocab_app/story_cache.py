@@ -0,0 +1,236 @@
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from datetime import timedelta
+from django.db.models import F, Q
+from django.utils.timezone import now
+from .conf import get_app_settings
+from .gen_ai_api import StoryGenerator, StreamingStoryGenerator, DEFAULT_MODEL_NAME, DEFAULT_TEMPERATURE
+from .models import StoryCacheEntry, StoryCacheStats, UserSettings
+
+STORY_CACHE_DEFAULTS = {
+    'TTL': timedelta(days=7),
+    'MAX_ENTRIES': 1000,
+    # Expired and least recently used stories are pruned, and the hit and miss counts written, at most this often,
+    # so a request only reads or inserts its own story
+    'MAINTENANCE_INTERVAL': timedelta(minutes=1),
+}
+
+# Hits and misses of this process not yet added to StoryCacheStats, and when it last maintained the cache
+_pending_counts = {'hits': 0, 'misses': 0}
+_maintenance = {'last': float('-inf')}
+_maintenance_lock = threading.Lock()
+
+
+class StoryCache:
+    def __init__(
+            self,
+            ttl: timedelta | None = None,
+            max_entries: int | None = None,
+            maintenance_interval: timedelta | None = None
+    ):
+        """
+        Initializes the database-backed cache of generated stories.
+
+        Args:
+            ttl (timedelta, optional): How long a story stays valid. Defaults to `STORY_CACHE['TTL']` from settings.
+            max_entries (int, optional): The maximum number of stored stories; the least recently used ones are
+                evicted first. Defaults to `STORY_CACHE['MAX_ENTRIES']` from settings.
+            maintenance_interval (timedelta, optional): How often the cache is pruned down to `max_entries`.
+                Defaults to `STORY_CACHE['MAINTENANCE_INTERVAL']` from settings.
+        """
+        config = get_app_settings('STORY_CACHE', STORY_CACHE_DEFAULTS)
+        self.ttl = ttl or config['TTL']
+        self.max_entries = max_entries or config['MAX_ENTRIES']
+        self.maintenance_interval = maintenance_interval if maintenance_interval is not None \
+            else config['MAINTENANCE_INTERVAL']
+
+    @staticmethod
+    def make_key(words: list[str], language_level: str, tone: str, model_name: str, temperature: float) -> str:
+        """
+        Builds the cache key of a story request. Words are case-folded, deduplicated and sorted,
+        so the same set of words always maps to the same story.
+
+        The key deliberately leaves out the user: a story is built from nothing but the request, so
+        every user asking for the same words shares it, and users who opt out with
+        `UserSettings.cache_stories` neither read nor store cached stories.
+
+        Returns:
+            str: A hex SHA-256 digest of the normalized request.
+        """
+        normalized_words = sorted({str(word).strip().casefold() for word in words})
+        raw_key = json.dumps([normalized_words, language_level, tone, model_name, float(temperature)])
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns the cached story for the key, or None if it is missing or expired.
+        """
+        entry = StoryCacheEntry.objects.filter(key=key).first()
+        if entry is None:
+            return None
+
+        date_now = now()
+        if entry.date_created < date_now - self.ttl:
+            entry.delete()
+            return None
+
+        StoryCacheEntry.objects.filter(pk=entry.pk).update(last_accessed=date_now, hits=F('hits') + 1)
+        return entry.result
+
+    def set(self, key: str, result: dict) -> None:
+        """
+        Stores a story with a single INSERT, keeping the one another request may have stored in the meantime.
+        """
+        date_now = now()
+        StoryCacheEntry.objects.bulk_create(
+            [StoryCacheEntry(key=key, result=result, date_created=date_now, last_accessed=date_now)],
+            ignore_conflicts=True,
+        )
+        self._maintain_if_due()
+
+    def maintain(self) -> None:
+        """
+        Adds the hit and miss counts of the process to `StoryCacheStats`, then drops the expired entries
+        and evicts the least recently used ones above the limit with a single DELETE.
+        """
+        with _maintenance_lock:
+            _maintenance['last'] = time.monotonic()
+        self._flush_counts()
+
+        evicted = StoryCacheEntry.objects.order_by('-last_accessed').values('id')[self.max_entries:]
+        StoryCacheEntry.objects.filter(Q(date_created__lt=now() - self.ttl) | Q(id__in=evicted)).delete()
+
+    def _maintain_if_due(self) -> None:
+        if time.monotonic() - _maintenance['last'] >= self.maintenance_interval.total_seconds():
+            self.maintain()
+
+    def generate_story(
+            self,
+            words: list[str],
+            language_level: str,
+            tone: str,
+            model_name: str = DEFAULT_MODEL_NAME,
+            temperature: float = DEFAULT_TEMPERATURE,
+            **generator_kwargs
+    ) -> tuple[dict, bool]:
+        """
+        Returns the cached story for the request, generating and storing it with `StoryGenerator` on a miss.
+
+        Returns:
+            tuple[dict, bool]: The story, questions and answers, and whether they came from the cache.
+        """
+        key = self.make_key(words, language_level, tone, model_name, temperature)
+        result = self.get(key)
+        self._count(hit=result is not None)
+        if result is not None:
+            self._maintain_if_due()
+            return result, True
+
+        generator = StoryGenerator(words=words, language_level=language_level, tone=tone, model_name=model_name,
+                                   temperature=temperature, **generator_kwargs)
+        result = generator.generate_story()
+        self.set(key, result)
+        return result, False
+
+    def stream_story(
+            self,
+            words: list[str],
+            language_level: str,
+            tone: str,
+            model_name: str = DEFAULT_MODEL_NAME,
+            temperature: float = DEFAULT_TEMPERATURE,
+            **generator_kwargs
+    ) -> Iterator[tuple[str, str | dict]]:
+        """
+        Streaming counterpart of `generate_story`. A cached story is sent as a single story event,
+        a generated one is stored once the stream has been fully received.
+
+        Returns:
+            Iterator[tuple[str, str | dict]]: The events of `StreamingStoryGenerator.stream_story`.
+        """
+        key = self.make_key(words, language_level, tone, model_name, temperature)
+        result = self.get(key)
+        self._count(hit=result is not None)
+        if result is not None:
+            self._maintain_if_due()
+            return iter([("story", result["story"]), ("result", result)])
+
+        generator = StreamingStoryGenerator(words=words, language_level=language_level, tone=tone,
+                                            model_name=model_name, temperature=temperature, **generator_kwargs)
+        return self._store_streamed_story(key, generator.stream_story())
+
+    def _store_streamed_story(
+            self,
+            key: str,
+            events: Iterator[tuple[str, str | dict]]
+    ) -> Iterator[tuple[str, str | dict]]:
+        for event, data in events:
+            if event == "result":
+                self.set(key, data)
+            yield event, data
+
+    @staticmethod
+    def _count(hit: bool) -> None:
+        with _maintenance_lock:
+            _pending_counts['hits' if hit else 'misses'] += 1
+
+    @staticmethod
+    def _flush_counts() -> None:
+        with _maintenance_lock:
+            counts = dict(_pending_counts)
+            _pending_counts.update(hits=0, misses=0)
+        if not any(counts.values()):
+            return
+
+        increments = {counter: F(counter) + count for counter, count in counts.items()}
+        if not StoryCacheStats.objects.filter(pk=1).update(**increments):
+            StoryCacheStats.objects.get_or_create(pk=1)
+            StoryCacheStats.objects.filter(pk=1).update(**increments)
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Returns the cache hit and miss counters, including the ones of this process not written yet,
+        and the number of stored stories.
+        """
+        StoryCache._flush_counts()
+        stats = StoryCacheStats.objects.filter(pk=1).first() or StoryCacheStats()
+        return {'hits': stats.hits, 'misses': stats.misses, 'entries': StoryCacheEntry.objects.count()}
+
+
+def user_caches_stories(user) -> bool:
+    """
+    Tells whether the user allows serving and storing their stories through the cache.
+    """
+    return UserSettings.objects.filter(user=user).values_list('cache_stories', flat=True).first() is not False
+
+
+def generate_user_story(user, words: list[str], language_level: str, tone: str) -> tuple[dict, bool]:
+    """
+    Generates a story for the user, going through the cache unless they opted out of it.
+
+    Returns:
+        tuple[dict, bool]: The story, questions and answers, and whether they came from the cache.
+    """
+    if user_caches_stories(user):
+        return StoryCache().generate_story(words=words, language_level=language_level, tone=tone)
+
+    generator = StoryGenerator(words=words, language_level=language_level, tone=tone)
+    return generator.generate_story(), False
+
+
+def stream_user_story(user, words: list[str], language_level: str, tone: str) -> Iterator[tuple[str, str | dict]]:
+    """
+    Streams a story for the user, going through the cache unless they opted out of it.
+
+    Returns:
+        Iterator[tuple[str, str | dict]]: ("story", html_chunk) events followed by a ("result", dict) event.
+    """
+    if user_caches_stories(user):
+        return StoryCache().stream_story(words=words, language_level=language_level, tone=tone)
+
+    generator = StreamingStoryGenerator(words=words, language_level=language_level, tone=tone)
+    return generator.stream_story()
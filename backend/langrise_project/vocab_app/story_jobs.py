@@ -0,0 +1,137 @@
+import logging
+import threading
+from datetime import timedelta
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils.timezone import now
+from .conf import get_app_settings
+from .models import StoryJob
+from .story_cache import generate_user_story
+
+STORY_WORKER_DEFAULTS = {
+    'EXECUTOR': 'thread',
+    'WORKERS': 4,
+    'POLL_INTERVAL': 1.0,
+    # Seconds a running job may go without a lease renewal before its worker is presumed dead; workers renew
+    # the lease of their running jobs every third of it
+    'LEASE_TIMEOUT': 300,
+    # Jobs whose lease expired this many times are failed instead of claimed again
+    'MAX_ATTEMPTS': 3,
+}
+
+
+def get_story_worker_config() -> dict:
+    return get_app_settings('STORY_WORKER', STORY_WORKER_DEFAULTS)
+
+
+def claim_pending_jobs(limit: int) -> list[int]:
+    """
+    Marks up to `limit` of the oldest pending story jobs as running and returns their ids. Running jobs
+    whose lease is older than `STORY_WORKER['LEASE_TIMEOUT']`, left behind by a crashed or killed worker,
+    are claimed again, or failed once they used up `STORY_WORKER['MAX_ATTEMPTS']`.
+
+    A job is claimed with a conditional UPDATE, so concurrent workers never process the same job twice.
+
+    Args:
+        limit (int): The maximum number of jobs to claim.
+
+    Returns:
+        list[int]: The ids of the claimed jobs.
+    """
+    config = get_story_worker_config()
+    date_now = now()
+    expired = Q(status=StoryJob.RUNNING, claimed_at__lt=date_now - timedelta(seconds=config['LEASE_TIMEOUT']))
+
+    claimed_ids = []
+    candidates = StoryJob.objects.filter(Q(status=StoryJob.PENDING) | expired).order_by('date_created') \
+                                 .values_list('id', 'status', 'claimed_at', 'attempts')[:limit]
+
+    for job_id, job_status, claimed_at, attempts in candidates:
+        job = StoryJob.objects.filter(id=job_id, status=job_status, claimed_at=claimed_at)
+        if attempts >= config['MAX_ATTEMPTS']:
+            job.update(status=StoryJob.FAILED, error="Story generation timed out.", date_finished=date_now)
+        elif job.update(status=StoryJob.RUNNING, date_started=date_now, claimed_at=date_now,
+                        attempts=attempts + 1):
+            claimed_ids.append(job_id)
+
+    return claimed_ids
+
+
+class LeaseHeartbeat:
+    """
+    Renews the lease of a running job from a background thread every third of `STORY_WORKER['LEASE_TIMEOUT']`,
+    so a generation outlasting the timeout isn't claimed and run again by another worker. Renewing stops
+    once the job was claimed by another worker anyway.
+    """
+    def __init__(self, job_id: int, claimed_at):
+        self.job_id = job_id
+        # The lease currently held; it moves with every renewal
+        self.claimed_at = claimed_at
+        self.interval = get_story_worker_config()['LEASE_TIMEOUT'] / 3
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def renew(self) -> bool:
+        """
+        Moves the lease forward, unless another worker claimed the job in the meantime.
+
+        Returns:
+            bool: Whether the lease is still held.
+        """
+        date_now = now()
+        if not StoryJob.objects.filter(id=self.job_id, status=StoryJob.RUNNING, claimed_at=self.claimed_at) \
+                               .update(claimed_at=date_now):
+            return False
+        self.claimed_at = date_now
+        return True
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                if not self.renew():
+                    break
+        finally:
+            connection.close()
+
+
+def process_story_job(job_id: int) -> str:
+    """
+    Generates the story of a claimed job and stores the result or the error on it.
+
+    Args:
+        job_id (int): The id of a job in the running state.
+
+    Returns:
+        str: The final status of the job.
+    """
+    close_old_connections()
+    try:
+        job = StoryJob.objects.select_related('user').get(id=job_id)
+        with LeaseHeartbeat(job_id, job.claimed_at) as lease:
+            try:
+                job.result, _ = generate_user_story(job.user, job.words, job.language_level, job.tone)
+                job.status = StoryJob.DONE
+            except (ValueError, RuntimeError) as e:
+                job.error = str(e)
+                job.status = StoryJob.FAILED
+            except Exception as e:
+                logging.error(f"Story job {job_id} failed: {e}")
+                job.error = "Story generation failed."
+                job.status = StoryJob.FAILED
+
+        job.date_finished = now()
+        # A worker whose lease was lost and whose job was claimed again leaves the result to the new worker
+        StoryJob.objects.filter(id=job_id, claimed_at=lease.claimed_at).update(
+            result=job.result, error=job.error, status=job.status, date_finished=job.date_finished
+        )
+        return job.status
+    finally:
+        close_old_connections()
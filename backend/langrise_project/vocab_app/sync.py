@@ -0,0 +1,102 @@
+import base64
+from datetime import datetime, timedelta
+from django.utils.timezone import now
+from .conf import get_app_settings
+from .models import Tombstone, Word, WordsList
+from .serializers import WordSerializer, WordsListSerializer
+from .utils import annotate_word_counts
+
+SYNC_DEFAULTS = {
+    # Changes are read from a bit before the cursor, so ones committed late by slow transactions aren't missed
+    'CURSOR_OVERLAP': timedelta(seconds=2),
+    # Deletions older than this are forgotten; clients with older cursors get a full snapshot
+    'TOMBSTONE_TTL': timedelta(days=90),
+}
+
+
+def get_sync_config() -> dict:
+    return get_app_settings('SYNC', SYNC_DEFAULTS)
+
+
+def encode_sync_cursor(moment: datetime) -> str:
+    """
+    Encodes the moment a sync was taken into an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+def decode_sync_cursor(cursor: str) -> datetime:
+    """
+    Decodes a cursor produced by `encode_sync_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor.")
+    if moment.tzinfo is None:
+        raise ValueError("Invalid cursor.")
+    return moment
+
+
+def record_deletions(user, kind: str, object_ids) -> None:
+    """
+    Stores tombstones of deleted words or words lists with a single INSERT, and drops the user's expired
+    ones through the `(user, deleted_at)` index.
+
+    Args:
+        user: The owner of the deleted objects.
+        kind (str): `Tombstone.WORD` or `Tombstone.WORDS_LIST`.
+        object_ids: The ids of the deleted objects.
+    """
+    date_now = now()
+    Tombstone.objects.bulk_create(
+        [Tombstone(user=user, kind=kind, object_id=object_id, deleted_at=date_now) for object_id in object_ids]
+    )
+    Tombstone.objects.filter(user=user, deleted_at__lt=date_now - get_sync_config()['TOMBSTONE_TTL']).delete()
+
+
+def get_changes(user, cursor: str | None = None) -> dict:
+    """
+    Returns the words lists and words of the user created or modified since the cursor, and the ids of
+    the ones deleted since then. Without a cursor, or with one older than the tombstones are kept,
+    everything is returned as a full snapshot.
+
+    Every query is a range scan of a `modified_at` or `deleted_at` index, so the cost follows the
+    number of changes, not the size of the collection. Objects changed right around the cursor may be
+    sent twice; clients apply the changes by id.
+
+    Args:
+        user: The user to sync.
+        cursor (str, optional): The cursor returned by the previous sync.
+
+    Returns:
+        dict: The changes, whether they are a full snapshot and the cursor of the next sync.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    config = get_sync_config()
+    sync_started = now()
+    since = decode_sync_cursor(cursor) if cursor else None
+    full = since is None or since < sync_started - config['TOMBSTONE_TTL']
+
+    words_lists = WordsList.objects.filter(user=user)
+    words = Word.objects.filter(words_list__user=user)
+    changes = {'full': full, 'deleted': {'words_lists': [], 'words': []}}
+
+    if not full:
+        since -= config['CURSOR_OVERLAP']
+        words_lists = words_lists.filter(modified_at__gte=since)
+        words = words.filter(modified_at__gte=since)
+        for kind, object_id in Tombstone.objects.filter(user=user, deleted_at__gte=since) \
+                                                .values_list('kind', 'object_id'):
+            changes['deleted']['words_lists' if kind == Tombstone.WORDS_LIST else 'words'].append(object_id)
+
+    changes['words_lists'] = list(annotate_word_counts(words_lists).order_by('id')
+                                  .values(*WordsListSerializer().fields))
+    changes['words'] = list(words.order_by('id').values(*WordSerializer().fields))
+    changes['cursor'] = encode_sync_cursor(sync_started)
+    return changes
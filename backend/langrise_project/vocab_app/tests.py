@@ -1,9 +1,40 @@
-from rest_framework.test import APIClient, APITestCase
-from rest_framework import status
-from django.test import TestCase
-from .models import Word, WordsList
+import csv
+import io
+import json
+import random
+import tempfile
+import time
+from datetime import timedelta
+from math import ceil
+from operator import itemgetter
+from types import SimpleNamespace
+from unittest.mock import patch
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command, CommandError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
+from supermemo2 import review
+from .db import write_transaction
+from .gen_ai_api import (DEFAULT_MODEL_NAME, DEFAULT_TEMPERATURE, JsonStringFieldStream, StoryGenerator, get_chat_model,
+                         get_encoder, merge_story_results)
+from .importer import import_words
+from .models import ReviewEvent, StoryCacheEntry, StoryJob, Tombstone, Word, WordsList
+from .scheduler import schedule_reviews, update_words_repetition
+from .serializers import WordSerializer
+from .similarity import (answer_similarity, bounded_edit_distance, count_transpositions, grade_answers,
+                         normalize_answer)
+from .story_cache import StoryCache, generate_user_story
+from .story_jobs import claim_pending_jobs, process_story_job
+from .sync import encode_sync_cursor
+from .utils import update_word_repetition
 
 
 class AuthenticationTests(APITestCase):
@@ -87,6 +118,45 @@ class AuthenticationTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertIn("detail", response.data)
 
+    def test_user_is_cached_per_user(self):
+        """Test that repeated requests of a user, with any of their access tokens, don't query the user again."""
+        caches["default"].clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        self.client.get(self.protected_url)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.protected_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('"auth_user"' in query["sql"] for query in queries.captured_queries))
+
+    def test_cached_user_is_forgotten_on_update(self):
+        """Test that changing the user through the current user endpoint refreshes the cached user."""
+        caches["default"].clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        self.client.get("/api/current-user/")
+
+        self.client.put("/api/current-user/", {"username": "renamed", "email": "renamed@example.com"}, format="json")
+        response = self.client.get("/api/current-user/")
+
+        self.assertEqual(response.data["username"], "renamed")
+
+    def test_deactivated_user_is_rejected_with_every_token(self):
+        """Test that deactivating a user drops their cached user for all of their access tokens."""
+        caches["default"].clear()
+        tokens = [RefreshToken.for_user(self.user).access_token for _ in range(2)]
+        for token in tokens:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            self.client.get(self.protected_url)
+
+        self.user.is_active = False
+        self.user.save()
+
+        for token in tokens:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            self.assertEqual(self.client.get(self.protected_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class WordViewSetTestCase(TestCase):
     def setUp(self):
@@ -129,6 +199,48 @@ class WordViewSetTestCase(TestCase):
         self.assertTrue(Word.objects.filter(word="Write Updated").exists())
         self.assertFalse(Word.objects.filter(id=self.word2.id).exists())
 
+    def test_update_and_delete_many_words(self):
+        words = [Word(word=f"word{i}", translation=f"translation{i}", words_list=self.words_list) for i in range(50)]
+        words = Word.objects.bulk_create(words)
+        url = f"/api/words/?words-list={self.words_list.id}"
+        payload = {
+            "update": [{"id": word.id, "translation": f"updated {word.word}"} for word in words[:25]],
+            "delete": [word.id for word in words[25:]]
+        }
+
+        # Words list lookup, savepoint, update fetch and bulk update, delete check and delete, tombstones insert
+        # and pruning, version bump, savepoint release
+        with self.assertNumQueries(10):
+            response = self.client.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Word.objects.filter(translation__startswith="updated").count(), 25)
+        self.assertEqual(Word.objects.filter(words_list=self.words_list).count(), 27)
+
+    def test_add_many_words(self):
+        url = f"/api/words/?words-list={self.words_list.id}"
+        payload = {"add": [{"word": f"word{i}", "translation": f"translation{i}"} for i in range(50)]}
+
+        # Words list lookup, savepoint, single words list validation, bulk insert, version bump, savepoint release
+        with self.assertNumQueries(6):
+            response = self.client.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["created_ids"]), 50)
+        created_words = Word.objects.filter(id__in=response.data["created_ids"]).order_by("id")
+        self.assertEqual(list(created_words.values_list("word", flat=True)), [f"word{i}" for i in range(50)])
+
+    def test_missing_words_are_reported_together(self):
+        url = f"/api/words/?words-list={self.words_list.id}"
+        payload = {"delete": [self.word1.id, 9998, 9999]}
+
+        response = self.client.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn("9998", response.data["detail"])
+        self.assertIn("9999", response.data["detail"])
+        self.assertTrue(Word.objects.filter(id=self.word1.id).exists())
+
     def test_create_with_invalid_words_list_id(self):
         invalid_words_list_id = self.words_list.id + 1000
         url = f"/api/words/?words-list={invalid_words_list_id}"
@@ -146,8 +258,529 @@ class WordViewSetTestCase(TestCase):
         response = self.client.post(url, payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_list_cursor_pagination(self):
+        """Test that pages follow the id order and the count is only sent when asked for."""
+        Word.objects.bulk_create(
+            [Word(word=f"word{i}", translation=f"translation{i}", words_list=self.words_list) for i in range(3)]
+        )
+        url = f"/api/words/?words-list={self.words_list.id}&page_size=2"
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        ids = [word["id"] for word in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            ids += [word["id"] for word in response.data["results"]]
+
+        self.assertEqual(ids, sorted(Word.objects.filter(words_list=self.words_list).values_list("id", flat=True)))
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(self.client.get(url + "&count=true").data["count"], 5)
+
+    def test_list_is_not_paginated_by_default(self):
+        """Test that without pagination parameters the words are returned as a plain list."""
+        response = self.client.get(f"/api/words/?words-list={self.words_list.id}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_list_sparse_fields(self):
+        """Test that the fields parameter limits both the returned fields and the selected columns."""
+        url = f"/api/words/?words-list={self.words_list.id}&fields=id,word,translation"
+
+        with patch.object(Word, "refresh_from_db", side_effect=AssertionError("deferred field loaded")):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({tuple(word) for word in response.data}, {("id", "word", "translation")})
+
+    def test_values_list_matches_serializer(self):
+        """Test that the .values() read path renders the same JSON as the serializer."""
+        update_word_repetition(self.word1, 4)
+        response = self.client.get(f"/api/words/?words-list={self.words_list.id}")
+
+        expected = WordSerializer(Word.objects.filter(words_list=self.words_list), many=True).data
+        self.assertEqual(sorted(json.loads(response.content), key=itemgetter("id")),
+                         sorted(json.loads(JSONRenderer().render(expected)), key=itemgetter("id")))
+
+    def test_malformed_json(self):
+        """Test that a malformed JSON body is rejected by the orjson parser."""
+        response = self.client.post(f"/api/words/?words-list={self.words_list.id}", data="{'add': [",
+                                    content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", response.data["detail"])
+
+    def test_list_unknown_field(self):
+        """Test that unknown fields are rejected."""
+        response = self.client.get(f"/api/words/?words-list={self.words_list.id}&fields=word,secret")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", response.data["fields"])
+
+
+class ConditionalListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        self.word = Word.objects.create(word="Write", translation="pisać", words_list=self.words_list)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/words/?words-list={self.words_list.id}"
+
+    def test_not_modified_without_loading_words(self):
+        """Test that a matching If-None-Match gets a 304 from the list version alone."""
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_etag_changes_with_words(self):
+        """Test that adding, updating, reviewing and deleting words each change the ETag."""
+        etags = [self.client.get(self.url)["ETag"]]
+
+        self.client.post(self.url, {"add": [{"word": "play", "translation": "grać"}]}, format="json")
+        etags.append(self.client.get(self.url)["ETag"])
+        self.client.patch(f"/api/words/{self.word.id}/", {"translation": "zapisać"}, format="json")
+        etags.append(self.client.get(self.url)["ETag"])
+        self.client.post("/api/words-review/", {"flashcards": [{"word_id": self.word.id, "rating": 3}]}, format="json")
+        etags.append(self.client.get(self.url)["ETag"])
+        self.client.delete(f"/api/words/{self.word.id}/")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[-1])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etags.append(response["ETag"])
+        self.assertEqual(len(set(etags)), 5)
+
+    def test_words_lists_etag(self):
+        """Test that the words lists endpoint is revalidated and changes its ETag on a rename."""
+        etag = self.client.get("/api/words-lists/")["ETag"]
+        self.assertEqual(self.client.get("/api/words-lists/", HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(f"/api/words-lists/{self.words_list.id}/", {"name": "Renamed"}, format="json")
+        response = self.client.get("/api/words-lists/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["name"], "Renamed")
+
+
+class SyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        self.other_list = WordsList.objects.create(name="Other List", user=self.user)
+        self.words = [Word.objects.create(word=f"word{i}", translation=f"słowo{i}", words_list=self.words_list)
+                      for i in range(5)]
+        self.other_word = Word.objects.create(word="other", translation="inny", words_list=self.other_list)
+        self.client.force_authenticate(user=self.user)
+
+        # Everything above was synced an hour ago
+        an_hour_ago = now() - timedelta(hours=1)
+        WordsList.objects.update(modified_at=an_hour_ago)
+        Word.objects.update(modified_at=an_hour_ago)
+        self.cursor = encode_sync_cursor(an_hour_ago + timedelta(minutes=1))
+
+    def test_full_snapshot_without_cursor(self):
+        """Test that a sync without a cursor returns every list and word of the user."""
+        response = self.client.get("/api/sync/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["full"])
+        self.assertEqual(len(response.data["words_lists"]), 2)
+        self.assertEqual(len(response.data["words"]), 6)
+        self.assertEqual(response.data["words_lists"][0]["word_count"], 5)
+        self.assertTrue(response.data["cursor"])
+
+    def test_only_changes_since_cursor(self):
+        """Test that only the words and lists changed after the cursor are returned, with deletions as ids."""
+        url = f"/api/words/?words-list={self.words_list.id}"
+        self.client.post(url, {"add": [{"word": "new", "translation": "nowy"}],
+                               "update": [{"id": self.words[0].id, "translation": "zmienione"}],
+                               "delete": [self.words[1].id]}, format="json")
+        self.client.post("/api/words-review/", {"flashcards": [{"word_id": self.words[2].id, "rating": 3}]},
+                         format="json")
+        self.client.delete(f"/api/words-lists/{self.other_list.id}/")
+
+        response = self.client.get("/api/sync/", {"since": self.cursor})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["full"])
+        self.assertEqual([words_list["id"] for words_list in response.data["words_lists"]], [self.words_list.id])
+        self.assertEqual(response.data["words_lists"][0]["word_count"], 5)
+        self.assertEqual(sorted(word["word"] for word in response.data["words"]), ["new", "word0", "word2"])
+        self.assertEqual(response.data["deleted"], {"words_lists": [self.other_list.id], "words": [self.words[1].id]})
+
+    def test_unchanged_since_cursor(self):
+        """Test that a sync right after another one returns no changes."""
+        cursor = self.client.get("/api/sync/", {"since": self.cursor}).data["cursor"]
+
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/sync/", {"since": cursor})
+
+        self.assertEqual(response.data["words_lists"], [])
+        self.assertEqual(response.data["words"], [])
+        self.assertEqual(response.data["deleted"], {"words_lists": [], "words": []})
+
+    def test_expired_cursor_gets_full_snapshot(self):
+        """Test that a cursor older than the kept tombstones gets a full snapshot."""
+        cursor = encode_sync_cursor(now() - timedelta(days=365))
+        response = self.client.get("/api/sync/", {"since": cursor})
+
+        self.assertTrue(response.data["full"])
+        self.assertEqual(len(response.data["words"]), 6)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get("/api/sync/", {"since": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_tombstones_pruned_per_user(self):
+        """Test that a deletion only drops the expired tombstones of its own user."""
+        other_user = User.objects.create_user(username="otheruser", password="password")
+        long_ago = now() - timedelta(days=365)
+        Tombstone.objects.bulk_create([Tombstone(user=user, kind=Tombstone.WORD, object_id=0, deleted_at=long_ago)
+                                       for user in (self.user, other_user)])
+
+        self.client.delete(f"/api/words/{self.words[0].id}/")
+
+        self.assertEqual(list(Tombstone.objects.filter(deleted_at=long_ago).values_list("user", flat=True)),
+                         [other_user.id])
+
+
+class WordImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        Word.objects.create(word="house", translation="dom", words_list=self.words_list)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/words-lists/{self.words_list.id}/import/"
+
+    def test_import_csv_with_header(self):
+        """Test that a CSV upload is imported by its header, skipping duplicates and invalid rows."""
+        content = "translation,word,pronunciation\nkot,cat,kæt\ndom,house,\npies,dog,\n,empty,\npies,dog,\n"
+        upload = SimpleUploadedFile("words.csv", content.encode())
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["duplicates"], 2)
+        self.assertEqual(response.data["invalid"], 1)
+        self.assertEqual(response.data["errors"], ["Line 5: Both the word and its translation are required."])
+        self.assertEqual(Word.objects.get(word="cat").pronunciation, "kæt")
+        self.assertIsNone(Word.objects.get(word="dog").pronunciation)
+
+    def test_import_anki_export(self):
+        """Test that Anki headers set the separator, drop the note type column and strip HTML."""
+        content = "#separator:tab\n#html:true\n#notetype column:1\nBasic\t<b>cat</b>\tkot\nBasic\tdog\tpies &amp; co\n"
+        upload = SimpleUploadedFile("deck.txt", content.encode())
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Word.objects.get(word="cat").translation, "kot")
+        self.assertEqual(Word.objects.get(word="dog").translation, "pies & co")
+
+    def test_import_in_chunks_dedupes_across_chunks(self):
+        """Test that every chunk is committed and reported, and duplicates of earlier chunks are skipped."""
+        lines = io.StringIO("".join(f"word{i % 7}\tsłowo{i}\n" for i in range(20)))
+        reports = []
+
+        totals = import_words(self.words_list, lines, "tsv", chunk_size=5, progress=reports.append)
+
+        self.assertEqual([report["rows"] for report in reports], [5, 10, 15, 20])
+        self.assertEqual(totals["created"], 7)
+        self.assertEqual(totals["duplicates"], 13)
+        self.assertEqual(Word.objects.filter(words_list=self.words_list).count(), 8)
+
+    def test_import_into_other_users_list(self):
+        """Test that importing into another user's list is not found."""
+        other_user = User.objects.create_user(username="other", password="password")
+        other_list = WordsList.objects.create(name="Other", user=other_user)
+        upload = SimpleUploadedFile("words.csv", b"cat,kot\n")
+
+        response = self.client.post(f"/api/words-lists/{other_list.id}/import/", {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_import_words_command(self):
+        """Test that the management command imports a file into a list created by name."""
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", delete=False) as file:
+            file.write("cat\tkot\ndog\tpies\n")
+        output = io.StringIO()
+
+        call_command("import_words", "testuser", "Animals", file.name, "--chunk-size", "1", stdout=output)
+
+        words_list = WordsList.objects.get(name="Animals", user=self.user)
+        self.assertEqual(Word.objects.filter(words_list=words_list).count(), 2)
+        self.assertIn("2 rows read: 2 created", output.getvalue())
+
+    def test_import_words_command_ambiguous_name(self):
+        """Test that a list name shared by several lists is rejected instead of guessed."""
+        WordsList.objects.create(name="Test List", user=self.user)
+
+        with self.assertRaisesMessage(CommandError, "several words lists named 'Test List'"):
+            call_command("import_words", "testuser", "Test List", "unused.csv", stdout=io.StringIO())
+
+
+class WordExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        self.other_list = WordsList.objects.create(name="Other List", user=self.user)
+        for i in range(5):
+            Word.objects.create(word=f"word{i}", translation=f"słowo, {i}", words_list=self.words_list)
+        Word.objects.create(word="other", translation="inny", words_list=self.other_list)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/words-lists/{self.words_list.id}/export/"
+
+    def test_export_csv(self):
+        """Test that a list is streamed as CSV that can be imported back."""
+        response = self.client.get(self.url, {"format": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="test-list.csv"', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row["word"] for row in rows], [f"word{i}" for i in range(5)])
+        self.assertEqual(rows[0]["translation"], "słowo, 0")
+        self.assertTrue(rows[0]["date_added"].endswith("Z"))
+
+        copy = WordsList.objects.create(name="Copy", user=self.user)
+        self.assertEqual(import_words(copy, io.StringIO(content), "csv")["created"], 5)
+
+    def test_export_jsonl_in_chunks(self):
+        """Test that a JSON Lines export is streamed chunk by chunk."""
+        with override_settings(WORD_EXPORT={"CHUNK_SIZE": 2}):
+            response = self.client.get(self.url, {"format": "jsonl"})
+            chunks = list(response.streaming_content)
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(chunks), 3)
+        lines = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[0]["words_list"], "Test List")
+        self.assertTrue(lines[0]["date_added"].endswith("Z"))
+
+    def test_export_other_users_list(self):
+        """Test that exporting another user's list is not found."""
+        other_user = User.objects.create_user(username="other", password="password")
+        other_list = WordsList.objects.create(name="Other", user=other_user)
+
+        response = self.client.get(f"/api/words-lists/{other_list.id}/export/", {"format": "jsonl"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_words_command(self):
+        """Test that the management command dumps every list of the user."""
+        output = io.StringIO()
+
+        call_command("export_words", "testuser", "--format", "jsonl", stdout=output)
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual({line["words_list"] for line in lines}, {"Test List", "Other List"})
+
+
+class RescheduleTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        self.date_now = now()
+        self.overdue = [Word.objects.create(word=f"overdue{i}", translation="t", words_list=self.words_list,
+                                            next_review=self.date_now - timedelta(days=30 + i)) for i in range(9)]
+        self.scheduled = Word.objects.create(word="scheduled", translation="t", words_list=self.words_list,
+                                             next_review=self.date_now + timedelta(days=2))
+        self.new = Word.objects.create(word="new", translation="t", words_list=self.words_list)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/words-lists/{self.words_list.id}/reschedule/"
+
+    def test_shift_in_one_update(self):
+        """Test that shifting postpones every scheduled review with a single UPDATE."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"mode": "shift", "days": 10}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rescheduled"], 10)
+        self.assertEqual(len([query for query in queries if query["sql"].startswith('UPDATE "vocab_app_word"')]), 1)
+        self.scheduled.refresh_from_db()
+        self.new.refresh_from_db()
+        self.assertEqual(self.scheduled.next_review, self.date_now + timedelta(days=12))
+        self.assertIsNone(self.new.next_review)
+
+    def test_spread_overdue_words(self):
+        """Test that spreading moves the overdue words evenly over the window, starting today."""
+        response = self.client.post(self.url, {"mode": "spread", "days": 3}, format="json")
+
+        self.assertEqual(response.data["rescheduled"], 9)
+        day_counts = {}
+        for word in Word.objects.filter(id__in=[word.id for word in self.overdue]):
+            day = (word.next_review - self.date_now).days
+            day_counts[day] = day_counts.get(day, 0) + 1
+        self.assertEqual(day_counts, {0: 3, 1: 3, 2: 3})
+        self.scheduled.refresh_from_db()
+        self.assertEqual(self.scheduled.next_review, self.date_now + timedelta(days=2))
+
+    def test_invalid_reschedule(self):
+        """Test that unknown modes and out of range days are rejected."""
+        self.assertEqual(self.client.post(self.url, {"mode": "later", "days": 3}, format="json").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, {"mode": "shift", "days": 0}, format="json").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_reschedule_words_command(self):
+        """Test that the management command shifts the reviews of every list of the user."""
+        output = io.StringIO()
+
+        call_command("reschedule_words", "testuser", "--shift", "1", stdout=output)
+
+        self.assertIn("Rescheduled 10 words", output.getvalue())
+        self.scheduled.refresh_from_db()
+        self.assertEqual(self.scheduled.next_review, self.date_now + timedelta(days=3))
+
+
+class ForecastTests(APITestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        self.other_list = WordsList.objects.create(name="Other List", user=self.user)
+        self.date_now = now()
+        for days, words_list in [(-3, self.words_list), (0, self.words_list), (1, self.words_list),
+                                 (1, self.other_list), (6, self.words_list), (40, self.words_list)]:
+            Word.objects.create(word=f"word{days}", translation="t", words_list=words_list,
+                                next_review=self.date_now + timedelta(days=days))
+        Word.objects.create(word="new", translation="t", words_list=self.words_list)
+        self.client.force_authenticate(user=self.user)
+
+    def test_forecast_buckets(self):
+        """Test that reviews are counted per day with one query, overdue words counted today."""
+        # The state of the lists behind the cache key and the grouped counts
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/forecast/", {"days": 7})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["overdue"], 1)
+        self.assertEqual([day["count"] for day in response.data["forecast"]], [2, 2, 0, 0, 0, 0, 1])
+        self.assertEqual(response.data["forecast"][0]["date"], self.date_now.date().isoformat())
+
+    def test_forecast_of_one_list(self):
+        """Test that the forecast can be limited to one list."""
+        response = self.client.get("/api/forecast/", {"days": 2, "words-list": self.other_list.id})
+
+        self.assertEqual([day["count"] for day in response.data["forecast"]], [0, 1])
+
+    def test_forecast_cached_until_review(self):
+        """Test that a cached forecast is served without counting the words and dropped when a word is reviewed."""
+        self.client.get("/api/forecast/", {"days": 7})
+        with self.assertNumQueries(1):
+            self.client.get("/api/forecast/", {"days": 7})
+
+        word = Word.objects.get(word="word0")
+        self.client.post("/api/words-review/", {"flashcards": [{"word_id": word.id, "rating": 0}]}, format="json")
+        response = self.client.get("/api/forecast/", {"days": 7})
+
+        self.assertEqual([day["count"] for day in response.data["forecast"]][:2], [1, 3])
+
+    def test_forecast_cached_until_list_deleted(self):
+        """Test that deleting a list drops the cached forecasts of its words."""
+        self.client.get("/api/forecast/", {"days": 7})
+
+        self.client.delete(f"/api/words-lists/{self.other_list.id}/")
+        response = self.client.get("/api/forecast/", {"days": 7})
+
+        self.assertEqual([day["count"] for day in response.data["forecast"]][:2], [2, 1])
+
+    def test_invalid_forecast_days(self):
+        """Test that an out of range number of days is rejected."""
+        response = self.client.get("/api/forecast/", {"days": 1000})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def test_seed_users_lists_and_words(self):
+        """Test that the seeding command creates N users x M lists x K words in mixed review states."""
+        call_command("seed_benchmark_data", users=2, lists=3, words=50, batch_size=40, stdout=io.StringIO())
+
+        self.assertEqual(User.objects.filter(username__startswith="bench").count(), 2)
+        self.assertEqual(WordsList.objects.count(), 6)
+        self.assertEqual(Word.objects.count(), 300)
+        self.assertTrue(Word.objects.filter(next_review__isnull=True).exists())
+        self.assertTrue(Word.objects.filter(next_review__lte=now()).exists())
+        self.assertTrue(self.client.login(username="bench0", password="bench"))
+
+
+class WordDueQueueTests(APITestCase):
+    def setUp(self):
+        # Create a test user with one list of overdue, new and future words
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.words_list = WordsList.objects.create(name="Test List", user=self.user)
+        date_now = now()
+
+        self.overdue_old = Word.objects.create(word="old", translation="stary", words_list=self.words_list,
+                                               next_review=date_now - timedelta(days=5))
+        self.overdue_recent = Word.objects.create(word="recent", translation="nowy", words_list=self.words_list,
+                                                  next_review=date_now - timedelta(days=1))
+        self.future = Word.objects.create(word="future", translation="przyszły", words_list=self.words_list,
+                                          next_review=date_now + timedelta(days=3))
+        self.new_word = Word.objects.create(word="fresh", translation="świeży", words_list=self.words_list)
+
+        # Authenticate the client
+        self.client.force_authenticate(user=self.user)
+
+        self.url = f"/api/words/due/?words-list={self.words_list.id}"
+
+    def test_due_words_order(self):
+        """Test that overdue words come first, most overdue first, followed by new words."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [word["id"] for word in response.data["results"]]
+        self.assertEqual(ids, [self.overdue_old.id, self.overdue_recent.id, self.new_word.id])
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_due_words_cursor(self):
+        """Test walking through the due queue one word at a time."""
+        ids = []
+        cursor = None
+        for _ in range(5):
+            url = f"{self.url}&limit=1" + (f"&cursor={cursor}" if cursor else "")
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [word["id"] for word in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, [self.overdue_old.id, self.overdue_recent.id, self.new_word.id])
+
+    def test_due_words_across_lists(self):
+        """Test that the queue covers all the user's lists when no list is given."""
+        other_list = WordsList.objects.create(name="Other", user=self.user)
+        other_word = Word.objects.create(word="other", translation="inny", words_list=other_list)
+
+        response = self.client.get("/api/words/due/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(other_word.id, [word["id"] for word in response.data["results"]])
+
+    def test_due_words_invalid_params(self):
+        """Test invalid limit and cursor values."""
+        self.assertEqual(self.client.get(f"{self.url}&limit=0").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(f"{self.url}&cursor=invalid").status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class WordsListViewSetTests(APITestCase):
+    LIST_QUERIES = 2
+
     def setUp(self):
         # Create a test user
         self.user = User.objects.create_user(username="testuser", password="password")
@@ -211,9 +844,66 @@ class WordsListViewSetTests(APITestCase):
         response = self.client.get(self.detail_url3)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_word_counts(self):
+        """Test that every list comes with its word, due, new and mastered counts."""
+        Word.objects.bulk_create([
+            Word(word="new", translation="nowy", words_list=self.words_list1),
+            Word(word="due", translation="zaległy", words_list=self.words_list1,
+                 last_reviewed=now() - timedelta(days=2), next_review=now() - timedelta(days=1), interval=1),
+            Word(word="mastered", translation="opanowany", words_list=self.words_list1,
+                 last_reviewed=now(), next_review=now() + timedelta(days=30), interval=30),
+            Word(word="other", translation="inny", words_list=self.words_list2),
+        ])
+
+        response = self.client.get(self.list_url)
+
+        counts = {words_list["id"]: [words_list[key] for key in
+                                     ("word_count", "due_count", "new_count", "mastered_count")]
+                  for words_list in response.data}
+        self.assertEqual(counts, {self.words_list1.id: [3, 1, 1, 1], self.words_list2.id: [1, 0, 1, 0],
+                                  self.words_list3.id: [0, 0, 0, 0]})
+        self.assertEqual(self.client.post(self.list_url, {"name": "Empty"}, format="json").data["word_count"], 0)
 
+    def test_list_query_count(self):
+        """Test that the lists and all their counts are read with a constant number of queries."""
+        for words_list in (self.words_list1, self.words_list2):
+            Word.objects.bulk_create(
+                [Word(word=f"word{i}", translation=f"translation{i}", words_list=words_list) for i in range(20)]
+            )
+
+        # The ETag versions and the grouped lists with their counts
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum(words_list["word_count"] for words_list in response.data), 40)
+
+    def test_etag_changes_when_a_review_comes_due(self):
+        """Test that the cached due counts are revalidated once a scheduled review comes due or a word changes."""
+        word = Word.objects.create(word="soon", translation="wkrótce", words_list=self.words_list1,
+                                   last_reviewed=now(), next_review=now() + timedelta(hours=1), interval=1)
+        etag = self.client.get(self.list_url)["ETag"]
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        with patch("vocab_app.views.now", return_value=now() + timedelta(hours=2)), \
+                patch("vocab_app.utils.now", return_value=now() + timedelta(hours=2)):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["due_count"], 1)
+
+        self.client.delete(f"/api/words/{word.id}/")
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(STORY_LLM_PROVIDER={'BACKEND': 'fake'})
 class GenerateStoryAPIViewTestCase(APITestCase):
     def setUp(self):
+        # Generate stories with the local fake model instead of the OpenAI API
+        get_chat_model.cache_clear()
+        self.addCleanup(get_chat_model.cache_clear)
+
         # Create a test user
         self.user = User.objects.create_user(username='testuser', password='password')
         self.client.login(username='testuser', password='password')
@@ -264,6 +954,360 @@ class GenerateStoryAPIViewTestCase(APITestCase):
         self.assertIn("error", response.data)
 
 
+class StoryCacheTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/generate-story/"
+        self.payload = {"words": ["apple", "journey", "music"], "language_level": "B1", "tone": "Inspiring"}
+        self.story = {"story": "<p>Story</p>", "questions": "1. Statement", "answers": "1. R"}
+        # Start without the counts earlier tests left pending in the process, right after a maintenance run
+        for patcher in (patch.dict("vocab_app.story_cache._pending_counts", hits=0, misses=0),
+                        patch.dict("vocab_app.story_cache._maintenance", last=time.monotonic())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeated_request_is_served_from_cache(self):
+        """Test that the same words, in any order or case, are generated only once."""
+        with patch("vocab_app.story_cache.StoryGenerator") as generator:
+            generator.return_value.generate_story.return_value = self.story
+            first = self.client.post(self.url, data=self.payload, format="json")
+            second = self.client.post(self.url, data={**self.payload, "words": ["Music", "apple", "journey"]},
+                                      format="json")
+
+        self.assertEqual(generator.call_count, 1)
+        self.assertEqual(first["X-Story-Cache"], "miss")
+        self.assertEqual(second["X-Story-Cache"], "hit")
+        self.assertEqual(second.data, self.story)
+        self.assertEqual(StoryCache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_miss_reads_and_inserts_once(self):
+        """Test that a miss between maintenance runs costs a settings read, a cache read and an insert."""
+        cache = StoryCache()
+        with patch("vocab_app.story_cache.StoryGenerator") as generator:
+            generator.return_value.generate_story.return_value = self.story
+            with self.assertNumQueries(3):
+                generate_user_story(self.user, **self.payload)
+
+        self.assertEqual(cache.get(cache.make_key(**self.payload, model_name=DEFAULT_MODEL_NAME,
+                                                  temperature=DEFAULT_TEMPERATURE)), self.story)
+
+    def test_default_settings_without_row(self):
+        """Test that a user without a settings row gets the default cache_stories instead of null."""
+        response = self.client.get("/api/current-user/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIs(response.data["cache_stories"], True)
+
+    def test_user_opt_out(self):
+        """Test that users who opt out never read from or write to the cache."""
+        response = self.client.put("/api/current-user/", data={"username": "testuser", "cache_stories": False},
+                                   format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["cache_stories"])
+
+        with patch("vocab_app.story_cache.StoryGenerator") as generator:
+            generator.return_value.generate_story.return_value = self.story
+            self.client.post(self.url, data=self.payload, format="json")
+            self.client.post(self.url, data=self.payload, format="json")
+
+        self.assertEqual(generator.call_count, 2)
+        self.assertFalse(StoryCacheEntry.objects.exists())
+
+    def test_ttl_and_lru_eviction(self):
+        """Test that expired stories are ignored and the least recently used ones are evicted."""
+        cache = StoryCache(ttl=timedelta(hours=1), max_entries=2, maintenance_interval=timedelta(0))
+        cache.set("first", self.story)
+        cache.set("second", self.story)
+        cache.get("first")
+        cache.set("third", self.story)
+
+        self.assertEqual(set(StoryCacheEntry.objects.values_list("key", flat=True)), {"first", "third"})
+
+        StoryCacheEntry.objects.filter(key="first").update(date_created=now() - timedelta(hours=2))
+        self.assertIsNone(cache.get("first"))
+        self.assertEqual(cache.get("third"), self.story)
+
+
+class StoryJobTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/generate-story/"
+        self.payload = {"words": ["apple", "journey", "music"], "language_level": "B1", "tone": "Inspiring",
+                        "async": True}
+        self.story = {"story": "<p>Story</p>", "questions": "1. Statement", "answers": "1. R"}
+
+    def test_job_lifecycle(self):
+        """Test enqueueing a story job, processing it and polling its result."""
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_url = f"{self.url}{response.data['job_id']}/"
+
+        self.assertEqual(self.client.get(job_url).data["status"], StoryJob.PENDING)
+
+        self.assertEqual(claim_pending_jobs(10), [response.data["job_id"]])
+        self.assertEqual(claim_pending_jobs(10), [])
+        with patch("vocab_app.story_cache.StoryGenerator") as generator:
+            generator.return_value.generate_story.return_value = self.story
+            self.assertEqual(process_story_job(response.data["job_id"]), StoryJob.DONE)
+
+        response = self.client.get(job_url)
+        self.assertEqual(response.data["status"], StoryJob.DONE)
+        self.assertEqual(response.data["result"], self.story)
+
+    def test_failed_job(self):
+        """Test that generation errors are reported on the job."""
+        job = StoryJob.objects.create(user=self.user, words=["apple"], language_level="B1", tone="Sad")
+        with patch("vocab_app.story_cache.StoryGenerator") as generator:
+            generator.return_value.generate_story.side_effect = RuntimeError("Model invocation failed.")
+            self.assertEqual(process_story_job(job.id), StoryJob.FAILED)
+
+        response = self.client.get(f"{self.url}{job.id}/")
+        self.assertEqual(response.data["error"], "Model invocation failed.")
+
+    def test_reclaim_expired_lease(self):
+        """Test that a running job left by a dead worker is claimed again, then failed after too many attempts."""
+        job = StoryJob.objects.create(user=self.user, words=["apple"], language_level="B1", tone="Sad")
+        self.assertEqual(claim_pending_jobs(10), [job.id])
+        self.assertEqual(claim_pending_jobs(10), [])
+
+        with override_settings(STORY_WORKER={"LEASE_TIMEOUT": 60, "MAX_ATTEMPTS": 2}):
+            StoryJob.objects.filter(id=job.id).update(claimed_at=now() - timedelta(minutes=5))
+            self.assertEqual(claim_pending_jobs(10), [job.id])
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (StoryJob.RUNNING, 2))
+
+            StoryJob.objects.filter(id=job.id).update(claimed_at=now() - timedelta(minutes=5))
+            self.assertEqual(claim_pending_jobs(10), [])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, StoryJob.FAILED)
+        self.assertEqual(job.error, "Story generation timed out.")
+
+    def test_expired_worker_does_not_overwrite(self):
+        """Test that a worker whose job was claimed again doesn't store its result."""
+        job = StoryJob.objects.create(user=self.user, words=["apple"], language_level="B1", tone="Sad")
+        claim_pending_jobs(10)
+
+        def reclaim_during_generation(*args, **kwargs):
+            StoryJob.objects.filter(id=job.id).update(claimed_at=now() + timedelta(seconds=1))
+            return self.story
+
+        with patch("vocab_app.story_cache.StoryGenerator") as generator:
+            generator.return_value.generate_story.side_effect = reclaim_during_generation
+            process_story_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, StoryJob.RUNNING)
+        self.assertIsNone(job.result)
+
+    def test_other_users_job(self):
+        """Test that users can't poll jobs of other users."""
+        other_user = User.objects.create_user(username="otheruser", password="password")
+        job = StoryJob.objects.create(user=other_user, words=["apple"], language_level="B1", tone="Sad")
+
+        response = self.client.get(f"{self.url}{job.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StoryJobLeaseTests(TransactionTestCase):
+    def test_lease_is_renewed_during_generation(self):
+        """Test that a generation outlasting the lease timeout keeps its lease and isn't claimed again."""
+        user = User.objects.create_user(username="testuser", password="password")
+        job = StoryJob.objects.create(user=user, words=["apple"], language_level="B1", tone="Sad")
+        story = {"story": "<p>Story</p>", "questions": "1. Statement", "answers": "1. R"}
+        reclaimed = []
+
+        def slow_generation(*args, **kwargs):
+            time.sleep(1.5)
+            reclaimed.extend(claim_pending_jobs(10))
+            return story
+
+        with override_settings(STORY_WORKER={"LEASE_TIMEOUT": 1}):
+            self.assertEqual(claim_pending_jobs(10), [job.id])
+            with patch("vocab_app.story_cache.StoryGenerator") as generator:
+                generator.return_value.generate_story.side_effect = slow_generation
+                self.assertEqual(process_story_job(job.id), StoryJob.DONE)
+
+        job.refresh_from_db()
+        self.assertEqual(reclaimed, [])
+        self.assertEqual((job.status, job.attempts, job.result), (StoryJob.DONE, 1, story))
+
+
+class ChatModelRegistryTests(TestCase):
+    def setUp(self):
+        get_chat_model.cache_clear()
+        self.addCleanup(get_chat_model.cache_clear)
+
+    def test_chat_models_are_reused(self):
+        """Test that generators with the same model settings share one chat model."""
+        with patch("vocab_app.llm_providers.ChatOpenAI",
+                   side_effect=lambda **kwargs: SimpleNamespace(**kwargs)) as chat_model:
+            first = StoryGenerator(["apple"], "B1", "Sad").model
+            second = StoryGenerator(["river"], "C1", "Happy").model
+            other = StoryGenerator(["apple"], "B1", "Sad", temperature=0.2).model
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(chat_model.call_count, 2)
+
+
+@override_settings(STORY_LLM_PROVIDER={'BACKEND': 'fake', 'OPTIONS': {'failure_rate': 1.0}})
+class FakeStoryProviderTests(APITestCase):
+    def setUp(self):
+        get_chat_model.cache_clear()
+        self.addCleanup(get_chat_model.cache_clear)
+
+    def test_fake_model_returns_valid_story(self):
+        """Test that the fake provider's output goes through the regular parser."""
+        with override_settings(STORY_LLM_PROVIDER={'BACKEND': 'fake'}):
+            result = StoryGenerator(["apple", "river"], "B1", "Sad").generate_story()
+
+        self.assertIn("apple", result["story"])
+        self.assertEqual(len(result["questions"].splitlines()), 3)
+        self.assertEqual(result["answers"].splitlines()[0], "1. R")
+
+    def test_injected_failures(self):
+        """Test that injected failures surface as model invocation errors."""
+        user = User.objects.create_user(username="testuser", password="password")
+        self.client.force_authenticate(user=user)
+
+        response = self.client.post("/api/generate-story/", data={"words": ["apple"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data["error"], "Model invocation failed.")
+
+
+class ChunkedStoryGenerationTests(TestCase):
+    def setUp(self):
+        get_chat_model.cache_clear()
+        self.addCleanup(get_chat_model.cache_clear)
+        # Use the character-based estimate so the test doesn't depend on downloading the tokenizer
+        encoder_patch = patch("vocab_app.gen_ai_api.get_encoder", return_value=None)
+        encoder_patch.start()
+        self.addCleanup(encoder_patch.stop)
+
+    def test_large_word_list_is_generated_in_chunks(self):
+        """Test that words exceeding the token budget are split, generated in one batch and merged."""
+        words = [f"word{i}" for i in range(300)]
+
+        def batch(prompts, config):
+            return [SimpleNamespace(content=json.dumps({
+                "story": f"<p>Story {index}</p>",
+                "questions": "1. First\n2. Second",
+                "answers": "1. R\n2. F",
+            })) for index, _ in enumerate(prompts)]
+
+        with patch("vocab_app.llm_providers.ChatOpenAI") as chat_model:
+            chat_model.return_value.max_tokens = 1000
+            chat_model.return_value.batch.side_effect = batch
+            result = StoryGenerator(words, "B1", "Sad", max_input_tokens=1500).generate_story()
+
+        prompts = chat_model.return_value.batch.call_args.args[0]
+        self.assertGreater(len(prompts), 1)
+        chunks = [prompt.to_string().split("following words: ")[1].split(". The story")[0] for prompt in prompts]
+        self.assertEqual("|".join(chunks), "|".join(words))
+        for prompt in prompts:
+            self.assertLessEqual(ceil(len(prompt.to_string()) / 4) + 1000, 1500)
+
+        self.assertEqual(result["story"], "\n".join(f"<p>Story {index}</p>" for index in range(len(prompts))))
+        self.assertEqual(result["questions"].splitlines()[-1], f"{2 * len(prompts)}. Second")
+        self.assertEqual(result["answers"].splitlines()[2], "3. R")
+        chat_model.return_value.invoke.assert_not_called()
+
+    def test_merged_questions_are_capped(self):
+        """Test that the merged questions don't exceed the limit and are taken from every chunk in turn."""
+        results = [{"story": f"<p>{chunk}</p>", "questions": "\n".join(f"{i}. {chunk}{i}" for i in range(1, 5)),
+                    "answers": "\n".join(f"{i}. R" for i in range(1, 5))} for chunk in "abc"]
+
+        merged = merge_story_results(results, question_limit=5)
+
+        self.assertEqual(merged["questions"], "1. a1\n2. a2\n3. b1\n4. b2\n5. c1")
+        self.assertEqual(len(merged["answers"].splitlines()), 5)
+
+    def test_encoder_failure_is_retried(self):
+        """Test that a tokenizer that failed to load is loaded again once the retry interval has passed."""
+        # setUp only patches the module attribute, `get_encoder` here is still the real function
+        encoder = SimpleNamespace(encode=lambda text, disallowed_special: text.split())
+        with patch("vocab_app.gen_ai_api.tiktoken.encoding_for_model", side_effect=[OSError("offline"), encoder]), \
+                patch("vocab_app.gen_ai_api.time.monotonic", side_effect=[0, 10, 100]), \
+                patch.dict("vocab_app.gen_ai_api._encoder_failures", clear=True), \
+                patch.dict("vocab_app.gen_ai_api._encoders", clear=True):
+            self.assertIsNone(get_encoder("test-model"))
+            self.assertIsNone(get_encoder("test-model"))
+            self.assertIs(get_encoder("test-model"), encoder)
+            self.assertIs(get_encoder("test-model"), encoder)
+
+
+class StoryStreamTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/generate-story/stream/"
+        # Chat models are shared by the process, don't let the patched ones leak into other tests
+        get_chat_model.cache_clear()
+        self.addCleanup(get_chat_model.cache_clear)
+        self.payload = {"words": ["apple", "journey", "music"], "language_level": "B1", "tone": "Inspiring"}
+        self.story = {"story": "<p>An \"apple\" a day.</p>\n<p>Café</p>", "questions": "1. Statement",
+                      "answers": "1. R"}
+
+    def test_json_string_field_stream(self):
+        """Test that the story field is decoded correctly whatever the chunk boundaries."""
+        raw = json.dumps({"answers": "1. R", **self.story})
+        for chunk_size in range(1, 8):
+            stream = JsonStringFieldStream("story")
+            decoded = "".join(stream.feed(raw[i:i + chunk_size]) for i in range(0, len(raw), chunk_size))
+            self.assertEqual(decoded, self.story["story"])
+
+    def test_stream_story_events(self):
+        """Test that story chunks are sent as they arrive, followed by the parsed result."""
+        raw = json.dumps(self.story)
+        chunks = [SimpleNamespace(content=raw[i:i + 10]) for i in range(0, len(raw), 10)]
+
+        with patch("vocab_app.llm_providers.ChatOpenAI") as chat_model:
+            chat_model.return_value.max_tokens = 1000
+            chat_model.return_value.stream.return_value = iter(chunks)
+            response = self.client.post(self.url, data=self.payload, format="json")
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = [event.split("\n") for event in body.strip().split("\n\n")]
+        story_chunks = [json.loads(data[len("data: "):]) for name, data in events if name == "event: story"]
+        self.assertGreater(len(story_chunks), 1)
+        self.assertEqual("".join(story_chunks), self.story["story"])
+        self.assertEqual(events[-1][0], "event: result")
+        self.assertEqual(json.loads(events[-1][1][len("data: "):]), self.story)
+
+    def test_stream_over_budget_words_in_chunks(self):
+        """Test that words exceeding the token budget are split and their stories streamed one after another."""
+        payload = {**self.payload, "words": [f"word{i}" for i in range(2000)]}
+
+        def stream(prompt):
+            index = chat_model.return_value.stream.call_count
+            raw = json.dumps({"story": f"<p>Story {index}</p>", "questions": "1. First", "answers": "1. R"})
+            return iter([SimpleNamespace(content=raw[i:i + 10]) for i in range(0, len(raw), 10)])
+
+        with patch("vocab_app.gen_ai_api.get_encoder", return_value=None), \
+                patch("vocab_app.llm_providers.ChatOpenAI") as chat_model:
+            chat_model.return_value.max_tokens = 1000
+            chat_model.return_value.stream.side_effect = stream
+            response = self.client.post(self.url, data=payload, format="json")
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        chunk_count = chat_model.return_value.stream.call_count
+        self.assertGreater(chunk_count, 1)
+        events = [event.split("\n") for event in body.strip().split("\n\n")]
+        story_chunks = [json.loads(data[len("data: "):]) for name, data in events if name == "event: story"]
+        stories = "\n".join(f"<p>Story {index}</p>" for index in range(1, chunk_count + 1))
+        self.assertEqual("".join(story_chunks), stories)
+        result = json.loads(events[-1][1][len("data: "):])
+        self.assertEqual(result["story"], stories)
+        self.assertEqual(result["questions"].splitlines()[-1], f"{chunk_count}. First")
+
+
 class WordsReviewViewTests(APITestCase):
 
     def setUp(self):
@@ -433,6 +1477,65 @@ class WordsReviewViewTests(APITestCase):
         self.assertEqual(len(response.data["updated_words"]), 2)  # Two words successfully updated
         self.assertGreater(len(response.data["errors"]), 0)  # Errors present
 
+    def test_batch_update_query_count(self):
+        """
+        Test that a review batch uses a constant number of queries regardless of its size.
+        """
+        words = [
+            Word.objects.create(word=f"word{i}", translation=f"translation{i}", words_list=self.words_list)
+            for i in range(20)
+        ]
+        payload = {
+            "flashcards": [{"word_id": word.id, "rating": 3} for word in words],
+            "write_words": [{"word_id": self.word1.id, "typed_word": "test"}]
+        }
+
+        # One fetch, one bulk update, the version bump and the review events insert, wrapped in a savepoint
+        # inside the test transaction
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, data=payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["updated_words"]), 21)
+        self.assertEqual(Word.objects.filter(last_reviewed__isnull=False).count(), 21)
+
+    def test_review_events_are_logged(self):
+        """
+        Test that every review is logged with its game, quality and the interval before and after it.
+        """
+        payload = {
+            "flashcards": [{"word_id": self.word1.id, "rating": 3}, {"word_id": self.word1.id, "rating": 3}],
+            "write_words": [{"word_id": self.word2.id, "typed_word": "exampel"}]
+        }
+
+        response = self.client.post(self.url, data=payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = list(ReviewEvent.objects.order_by("id").values_list(
+            "word_id", "game_type", "quality", "previous_interval", "next_interval"))
+        self.word1.refresh_from_db()
+        self.assertEqual(events, [
+            (self.word1.id, "flashcards", 3, None, events[0][4]),
+            (self.word1.id, "flashcards", 3, events[0][4], self.word1.interval),
+            (self.word2.id, "write_words", 4, None, events[2][4]),
+        ])
+
+    @override_settings(REVIEW_LOG={"BUFFERED": True, "FLUSH_EVENTS": 3})
+    def test_buffered_review_events(self):
+        """
+        Test that buffered review events are inserted once the buffer is full.
+        """
+        payload = {"flashcards": [{"word_id": self.word1.id, "rating": 3}, {"word_id": self.word2.id, "rating": 2}]}
+
+        with patch("vocab_app.review_log._buffer", None), patch("atexit.register"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.url, data=payload, format="json")
+            self.assertEqual(ReviewEvent.objects.count(), 0)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.url, data=payload, format="json")
+            self.assertEqual(ReviewEvent.objects.count(), 4)
+
     def test_unauthenticated_user(self):
         """
         Test the endpoint for unauthenticated users.
@@ -447,3 +1550,97 @@ class WordsReviewViewTests(APITestCase):
         response = self.client.post(self.url, data=payload, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SchedulerParityTests(TestCase):
+    def test_schedule_reviews_matches_supermemo2(self):
+        """Test that the vectorized scheduler gives exactly the same results as supermemo2."""
+        rng = random.Random(42)
+        cases = [
+            (rng.choice([2.5, 1.3, rng.uniform(1.3, 3.5)]), rng.randint(0, 400), rng.randint(0, 12), rng.randint(0, 5))
+            for _ in range(5000)
+        ]
+
+        easiness, interval, repetitions = schedule_reviews(*zip(*cases))
+
+        for (e, i, r, q), new_e, new_i, new_r in zip(cases, easiness.tolist(), interval.tolist(), repetitions.tolist()):
+            expected = review(quality=q, easiness=e, interval=i, repetitions=r)
+            self.assertEqual((new_e, new_i, new_r),
+                             (expected["easiness"], expected["interval"], expected["repetitions"]))
+
+    def test_update_words_repetition_matches_scalar_path(self):
+        """Test that batched updates, including repeated words, match sequential update_word_repetition calls."""
+        user = User.objects.create_user(username="testuser", password="password")
+        words_list = WordsList.objects.create(name="Test List", user=user)
+        for i in range(10):
+            Word.objects.create(word=f"word{i}", translation=f"translation{i}", words_list=words_list)
+        ratings = [5, 3, 0, 4, 2, 5, 1, 3, 4, 5]
+        review_datetime = now()
+
+        scalar_words = list(Word.objects.order_by("id"))
+        batch_words = list(Word.objects.order_by("id"))
+        reviews = list(zip(batch_words, ratings)) + list(zip(batch_words, reversed(ratings)))
+
+        with patch("vocab_app.utils.now", return_value=review_datetime):
+            expected_next_reviews = [
+                update_word_repetition(word, rating, save=False).next_review
+                for word, rating in list(zip(scalar_words, ratings)) + list(zip(scalar_words, reversed(ratings)))
+            ]
+        next_reviews = update_words_repetition(reviews, review_datetime=review_datetime)
+
+        self.assertEqual(next_reviews, expected_next_reviews)
+        for scalar_word, batch_word in zip(scalar_words, batch_words):
+            self.assertEqual(
+                (scalar_word.next_review, scalar_word.interval, scalar_word.easiness, scalar_word.repetitions),
+                (batch_word.next_review, batch_word.interval, batch_word.easiness, batch_word.repetitions)
+            )
+
+
+class AnswerSimilarityTests(TestCase):
+    def test_normalization(self):
+        """Test that case, accents and whitespace don't affect grading."""
+        self.assertEqual(normalize_answer("  Żółw   Straße "), "zolw strasse")
+        self.assertEqual(grade_answers([("Café au lait", "cafe  AU lait"), ("mówić", "MOWIC")]), [5, 5])
+
+    def test_similarity_is_normalized_like_difflib_ratio(self):
+        """Test that the similarity keeps the scale of difflib's ratio the grade thresholds were chosen for."""
+        self.assertAlmostEqual(answer_similarity("hello", "helo"), 8 / 9)
+        self.assertAlmostEqual(answer_similarity("friendship", "friendshop"), 18 / 20)
+        self.assertEqual(grade_answers([("hello", "helo"), ("journey", "jurney"), ("friendship", "friendshop")]),
+                         [4, 4, 4])
+
+    def test_transposition_and_bound(self):
+        """Test that swapped letters cost one edit and hopeless answers exit early with 0."""
+        self.assertEqual(bounded_edit_distance("hello", "hlelo", 10), 1)
+        self.assertIsNone(bounded_edit_distance("apple", "orange juice", 3))
+        self.assertEqual(answer_similarity("apple", "xyz"), 0.0)
+        self.assertEqual(grade_answers([("hello", "hlelo"), ("apple", "xyz")]), [4, 0])
+
+    def test_transpositions_near_their_position(self):
+        """Test that only swapped pairs an alignment within the distance could reach lower the bound."""
+        self.assertEqual(count_transpositions("ab" + "x" * 20, "y" * 20 + "ba", 2), 0)
+        self.assertEqual(count_transpositions("ab" + "x" * 20, "y" * 20 + "ba", 20), 1)
+        self.assertEqual(count_transpositions("abab", "baba", 4), 2)
+        self.assertEqual(grade_answers([("a long sentence to type", "a lnog sentence to tpye")]), [4])
+
+
+class SQLiteTuningTests(TransactionTestCase):
+    def test_connection_pragmas(self):
+        """Test that new connections get the configured pragmas."""
+        connection.close()
+        with connection.cursor() as cursor:
+            pragmas = {pragma: cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+                       for pragma in ("synchronous", "busy_timeout", "cache_size")}
+
+        self.assertEqual(pragmas, {"synchronous": 1, "busy_timeout": 5000, "cache_size": -64 * 1024})
+
+    def test_write_transaction_begins_immediate(self):
+        """Test that write transactions take the write lock as they begin, and other transactions don't."""
+        with CaptureQueriesContext(connection) as queries:
+            with write_transaction():
+                WordsList.objects.filter(id=0).update(version=1)
+            with transaction.atomic():
+                WordsList.objects.filter(id=0).update(version=1)
+
+        begins = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("BEGIN")]
+        self.assertEqual(begins, ["BEGIN IMMEDIATE", "BEGIN"])
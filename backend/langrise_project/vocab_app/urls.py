@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (RegisterViewSet, WordViewSet, WordsListViewSet, GenerateStoryAPIView, CurrentUserAPIView,
-                    WordsReviewView)
+                    WordsReviewView, StoryJobAPIView, GenerateStoryStreamAPIView, SyncAPIView,
+                    ForecastAPIView)
 
 router = DefaultRouter()
 router.register('register', RegisterViewSet , basename='register')
@@ -11,6 +12,10 @@ router.register('words-lists', WordsListViewSet, basename='words_lists')
 urlpatterns = [
     path('', include(router.urls)),
     path('generate-story/', GenerateStoryAPIView.as_view(), name='generate_story'),
+    path('generate-story/stream/', GenerateStoryStreamAPIView.as_view(), name='generate_story_stream'),
+    path('generate-story/<int:job_id>/', StoryJobAPIView.as_view(), name='story_job'),
     path('current-user/', CurrentUserAPIView.as_view(), name='current_user'),
     path('words-review/', WordsReviewView.as_view(), name='word_review'),
+    path('sync/', SyncAPIView.as_view(), name='sync'),
+    path('forecast/', ForecastAPIView.as_view(), name='forecast'),
 ]
@@ -1,11 +1,21 @@
+import base64
+from collections.abc import Iterable
 from datetime import datetime
+from django.db.models import Count, F, Q, QuerySet
 from django.utils.timezone import now, make_aware, get_current_timezone
 from supermemo2 import first_review, review
-from .models import Word
-from difflib import SequenceMatcher
+from .models import Word, WordsList
 
+REPETITION_FIELDS = ['last_reviewed', 'next_review', 'interval', 'easiness', 'repetitions']
 
-def update_word_repetition(word: Word, rating: int) -> Word:
+# Words reviewed at intervals of at least this many days count as mastered
+MASTERED_INTERVAL_DAYS = 21
+
+DUE_CURSOR_OVERDUE = 'd'
+DUE_CURSOR_NEW = 'n'
+
+
+def update_word_repetition(word: Word, rating: int, save: bool = True) -> Word:
     """
     Updates the repetition information of a given word based on its review quality rating.
 
@@ -13,11 +23,15 @@ def update_word_repetition(word: Word, rating: int) -> Word:
     next review date, interval, easiness factor, and repetitions for a word
     based on the quality of the review rating provided. If the word has not
     been previously reviewed, it initializes the review data with a first
-    review. The word's review progress is then updated and persisted.
+    review. The word's review progress is then updated and, unless `save`
+    is False, persisted.
 
     :param word: The word object that represents the word being reviewed.
     :param rating: The quality rating for the current review, on a
         scale (0-5) determining how well the word was recalled.
+    :param save: Whether to save the word immediately. Pass False to update
+        the object in memory only, e.g. to persist many words with
+        `bulk_update` afterwards.
     :return: The updated word object after applying the review calculations.
     :rtype: Word
     """
@@ -48,53 +62,125 @@ def update_word_repetition(word: Word, rating: int) -> Word:
     word.easiness = sm_result['easiness']
     word.repetitions = sm_result['repetitions']
 
-    word.save()
+    if save:
+        word.save()
     return word
 
 
-def compare_word_similarity(original: str, user_input: str) -> float:
+def parse_id(value) -> int | None:
+    """
+    Converts an id sent by the client to an integer.
+
+    :param value: The raw id, usually an int or a numeric string.
+    :return: The id as an integer, or None if it is missing or not a valid integer.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def bump_words_lists_version(words_list_ids: Iterable[int]) -> None:
+    """
+    Increments the version of the given words lists and marks them as modified with a single UPDATE,
+    invalidating the ETags of the responses built from them and sending their new counts with the next
+    sync. Called whenever a list or its words change.
+
+    :param words_list_ids: The ids of the changed words lists.
+    """
+    words_list_ids = set(words_list_ids)
+    if words_list_ids:
+        WordsList.objects.filter(id__in=words_list_ids).update(version=F('version') + 1, modified_at=now())
+
+
+def annotate_word_counts(words_lists: QuerySet) -> QuerySet:
     """
-    Compares the similarity between two words or phrases using a similarity ratio. It computes
-    a measure of similarity based on the sequences of characters in the input strings.
-
-    The function takes two strings as inputs, converts them to lowercase for case-insensitive
-    comparison, and calculates their similarity ratio using the SequenceMatcher from the
-    `difflib` library. It returns a floating-point value between 0 and 1, where 1 indicates
-    identical strings and values closer to 0 represent less similarity.
-
-    :param original: The original word or phrase against which comparison is made.
-    :type original: str
-    :param user_input: The input word or phrase to be compared with the original.
-    :type user_input: str
-    :return: A floating-point similarity ratio, where 1 denotes identical inputs and closer
-             to 0 represents less similarity.
-    :rtype: float
+    Annotates words lists with the number of their words, due words, never-reviewed words and mastered
+    words, all computed in the single grouped query of the words lists.
+
+    Due and new words follow the phases of `get_due_words`; mastered words have an interval of at
+    least `MASTERED_INTERVAL_DAYS` days.
+
+    :param words_lists: A queryset of words lists.
+    :return: The queryset annotated with `word_count`, `due_count`, `new_count` and `mastered_count`.
     """
-    similarity_ratio = SequenceMatcher(None, original, user_input).ratio()
-    return similarity_ratio
+    return words_lists.annotate(
+        word_count=Count('word'),
+        due_count=Count('word', filter=Q(word__next_review__lte=now())),
+        new_count=Count('word', filter=Q(word__next_review__isnull=True)),
+        mastered_count=Count('word', filter=Q(word__interval__gte=MASTERED_INTERVAL_DAYS)),
+    )
 
 
-def get_grade_based_on_similarity(similarity_ratio: float) -> int:
+def encode_due_cursor(word: Word) -> str:
     """
-    Determines a grade based on a given similarity ratio. The function evaluates
-    the similarity ratio and assigns a corresponding grade according to predefined
-    thresholds. The grade ranges from 0 to 5, with higher similarity ratios
-    receiving higher grades.
-
-    :param similarity_ratio: A float representing the similarity ratio,
-        where 1.0 means completely similar and 0.0 means no similarity.
-    :return: An integer grade ranging from 0 to 5, proportional to the
-        level of similarity indicated by the similarity ratio.
+    Encodes the position of the last returned word of a due-words page into an opaque cursor.
+
+    Overdue words are positioned by their `next_review` and `id`, never-reviewed words only by their `id`.
+
+    :param word: The last word returned on the current page.
+    :return: A URL-safe cursor string pointing right after the given word.
     """
-    if similarity_ratio >= 0.96:
-        return 5
-    elif similarity_ratio >= 0.88:
-        return 4
-    elif similarity_ratio >= 0.75:
-        return 3
-    elif similarity_ratio >= 0.6:
-        return 2
-    elif similarity_ratio >= 0.45:
-        return 1
+    if word.next_review is None:
+        raw = f"{DUE_CURSOR_NEW}|{word.id}"
     else:
-        return 0
+        raw = f"{DUE_CURSOR_OVERDUE}|{word.id}|{word.next_review.isoformat()}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_due_cursor(cursor: str) -> tuple[str, int, datetime | None]:
+    """
+    Decodes a cursor produced by `encode_due_cursor`.
+
+    :param cursor: The opaque cursor string sent back by the client.
+    :return: A tuple of (phase, word id, next_review) where phase is either overdue or new.
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        phase, word_id = parts[0], int(parts[1])
+        if phase == DUE_CURSOR_NEW and len(parts) == 2:
+            return phase, word_id, None
+        if phase == DUE_CURSOR_OVERDUE and len(parts) == 3:
+            return phase, word_id, datetime.fromisoformat(parts[2])
+    except (ValueError, IndexError, UnicodeDecodeError):
+        pass
+    raise ValueError("Invalid cursor.")
+
+
+def get_due_words(words: QuerySet, limit: int, cursor: str | None = None) -> tuple[list[Word], str | None]:
+    """
+    Returns a page of words that should be studied now: the most overdue words first, followed by
+    words that have never been reviewed.
+
+    Both phases are read with keyset conditions on the (words_list, next_review) index, so only
+    `limit + 1` rows are fetched per phase regardless of the size of the list.
+
+    :param words: A queryset of words already restricted to the user (and optionally to one list).
+    :param limit: The maximum number of words to return.
+    :param cursor: An optional cursor returned by a previous call.
+    :return: A tuple of (words, next cursor); the cursor is None when there are no more due words.
+    :raises ValueError: If the cursor is malformed.
+    """
+    phase, last_id, last_next_review = decode_due_cursor(cursor) if cursor else (DUE_CURSOR_OVERDUE, None, None)
+    page = []
+
+    if phase == DUE_CURSOR_OVERDUE:
+        overdue = words.filter(next_review__lte=now())
+        if last_id is not None:
+            overdue = overdue.filter(
+                Q(next_review__gt=last_next_review) | Q(next_review=last_next_review, id__gt=last_id)
+            )
+        page = list(overdue.order_by('next_review', 'id')[:limit + 1])
+        last_id = None
+
+    if len(page) <= limit:
+        new_words = words.filter(next_review__isnull=True)
+        if last_id is not None:
+            new_words = new_words.filter(id__gt=last_id)
+        page += list(new_words.order_by('id')[:limit + 1 - len(page)])
+
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_due_cursor(page[-1])
+    return page, None
@@ -1,13 +1,32 @@
+import hashlib
+import io
+import json
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers, quote_etag, parse_etags
+from django.utils.text import slugify
+from django.utils.timezone import now
 from rest_framework import viewsets, status
-from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Word, WordsList
+from .db import write_transaction
+from .exporter import export_words
+from .forecast import get_review_forecast
+from .importer import guess_import_format, import_words, IMPORT_FORMATS
+from .models import Word, WordsList, StoryJob, ReviewEvent, Tombstone
+from .pagination import IdCursorPagination
+from .renderers import CSVRenderer, JSONLinesRenderer
 from .serializers import WordSerializer, WordsListSerializer, RegisterSerializer, CurrentUserSerializer
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db import transaction
-from .gen_ai_api import StoryGenerator
-from .utils import update_word_repetition, compare_word_similarity, get_grade_based_on_similarity
+from .story_cache import generate_user_story, stream_user_story
+from .similarity import answer_grade
+from .utils import annotate_word_counts, bump_words_lists_version, get_due_words, parse_id, REPETITION_FIELDS
+from .scheduler import shift_reviews, spread_overdue_reviews, update_words_repetition
+from .review_log import log_review_events
+from .sync import get_changes, record_deletions
 
 
 # Create your views here.
@@ -35,11 +54,104 @@ class CurrentUserAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class WordViewSet(viewsets.ModelViewSet):
+class SparseFieldsMixin:
+    """
+    Lets GET requests pick the returned fields with a comma-separated `fields` query parameter.
+    The serializer drops the other fields and the SELECT is limited to their columns with `.only()`.
+    """
+    def get_requested_fields(self) -> list[str] | None:
+        if self.request.method != 'GET' or 'fields' not in self.request.query_params:
+            return None
+
+        fields = [field.strip() for field in self.request.query_params['fields'].split(',') if field.strip()]
+        available_fields = self.get_serializer_class()().fields
+        unknown_fields = [field for field in fields if field not in available_fields]
+        if unknown_fields:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown_fields)}."})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields is not None:
+            model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+            queryset = queryset.only('id', *(field for field in fields if field in model_fields))
+        return queryset
+
+
+class ValuesListMixin:
+    """
+    Builds list responses from plain dicts read with `.values()` instead of serializing model instances
+    field by field. Only meant for serializers whose fields are all model fields or annotations, output
+    as they are; datetimes are left to the renderer.
+    """
+    def list(self, request, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is None:
+            fields = list(self.get_serializer_class()().fields)
+
+        # The cursor pagination needs the id of every row
+        rows = self.filter_queryset(self.get_queryset()).values('id', *fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            rows = page
+        if 'id' not in fields:
+            rows = [{field: row[field] for field in fields} for row in rows]
+        else:
+            rows = list(rows)
+
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
+
+
+class ConditionalListMixin:
+    """
+    Sends an ETag with list responses and answers a matching `If-None-Match` with 304 Not Modified.
+    The ETag is derived from the `etag_fields` of the words lists behind the response, by default
+    their versions, so checking it never loads any Word rows.
+    """
+    etag_fields = ['id', 'version']
+
+    def get_versioned_words_lists(self) -> QuerySet:
+        raise NotImplementedError
+
+    def get_list_etag(self) -> str:
+        versions = list(self.get_versioned_words_lists().order_by('id').values_list(*self.etag_fields))
+        raw_etag = json.dumps([self.request.user.pk, self.request.get_full_path(), versions], default=str)
+        return quote_etag(hashlib.sha256(raw_etag.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag()
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        # Let the browser cache the response, but revalidate it on every request
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class WordViewSet(ConditionalListMixin, ValuesListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = WordSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
     queryset = Word.objects.all()
 
+    DUE_WORDS_DEFAULT_LIMIT = 20
+    DUE_WORDS_MAX_LIMIT = 200
+
     def get_queryset(self):
         words_list_id = self.request.query_params.get('words-list', None)
 
@@ -53,6 +165,26 @@ class WordViewSet(viewsets.ModelViewSet):
         else:
             return Word.objects.filter(words_list__user=self.request.user)
 
+    def get_versioned_words_lists(self):
+        # A missing words list gives an ETag no response was ever sent with, so `list` reports it as not found
+        words_lists = WordsList.objects.filter(user=self.request.user)
+        words_list_id = self.request.query_params.get('words-list', None)
+
+        if words_list_id is not None:
+            words_lists = words_lists.filter(id=parse_id(words_list_id))
+        return words_lists
+
+    def perform_update(self, serializer):
+        previous_words_list_id = serializer.instance.words_list_id
+        word = serializer.save()
+        bump_words_lists_version([previous_words_list_id, word.words_list_id])
+
+    def perform_destroy(self, instance):
+        word_id = instance.id
+        instance.delete()
+        bump_words_lists_version([instance.words_list_id])
+        record_deletions(self.request.user, Tombstone.WORD, [word_id])
+
     def create(self, request, *args, **kwargs):
         user = request.user
         words_list_id = request.query_params.get('words-list', None)
@@ -66,7 +198,9 @@ class WordViewSet(viewsets.ModelViewSet):
         except WordsList.DoesNotExist:
             raise NotFound(detail="The requested words list does not exist or you don't have access to it.")
 
-        with transaction.atomic():
+        created_ids = []
+
+        with write_transaction():
 
             if 'add' in payload:
                 add_data = payload['add']
@@ -77,46 +211,114 @@ class WordViewSet(viewsets.ModelViewSet):
                 serializer = self.get_serializer(data=data, many=isinstance(data, list))
                 serializer.is_valid(raise_exception=True)
                 self.perform_create(serializer)
+                created_ids = [word.id for word in serializer.instance]
 
             if 'update' in payload:
                 update_data = payload['update']
                 if isinstance(update_data, dict):
                     update_data = [update_data]
 
-                for word in update_data:
-                    word_id = word.pop('id', None)
-                    word_data = {**word, 'words_list': words_list_id}
+                word_ids = [parse_id(word.get('id')) for word in update_data]
+                words = Word.objects.filter(id__in=word_ids, words_list=words_list_id).in_bulk()
+                self._raise_missing_words(word_ids, words)
+
+                word_data = [{key: value for key, value in word.items() if key not in ('id', 'words_list')}
+                             for word in update_data]
+                serializer = self.get_serializer(data=word_data, many=True, partial=True)
+                serializer.is_valid(raise_exception=True)
+
+                fields = set()
+                date_now = now()
+                for word_id, validated_data in zip(word_ids, serializer.validated_data):
+                    for field, value in validated_data.items():
+                        setattr(words[word_id], field, value)
+                    words[word_id].modified_at = date_now
+                    fields.update(validated_data)
 
-                    try:
-                        word_obj = Word.objects.get(id=word_id, words_list=words_list_id)
-                        serializer = self.get_serializer(word_obj, data=word_data, partial=True)
-                        serializer.is_valid(raise_exception=True)
-                        self.perform_update(serializer)
-                    except Word.DoesNotExist:
-                        raise NotFound(detail=f"The requested word word_id={word_id} does not exist or you don't have "
-                                              f"access to it.")
+                if fields:
+                    Word.objects.bulk_update(words.values(), [*fields, 'modified_at'])
 
             if 'delete' in payload:
                 delete_data = payload['delete']
                 if isinstance(delete_data, (str, int)):
                     delete_data = [delete_data]
 
-                for word_id in delete_data:
-                    try:
-                        word_obj = Word.objects.get(id=word_id, words_list=words_list_id)
-                        word_obj.delete()
-                    except Word.DoesNotExist:
-                        raise NotFound(detail="The requested word does not exist or you don't have access to it.")
+                word_ids = [parse_id(word_id) for word_id in delete_data]
+                words = Word.objects.filter(id__in=word_ids, words_list=words_list_id)
+                self._raise_missing_words(word_ids, set(words.values_list('id', flat=True)))
+                words.delete()
+                record_deletions(user, Tombstone.WORD, set(word_ids))
+
+            bump_words_lists_version([words_list_id])
+            return Response({"message": "Changes saved successfully!", "created_ids": created_ids},
+                            status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _raise_missing_words(word_ids: list[int | None], existing_ids) -> None:
+        missing_ids = [word_id for word_id in word_ids if word_id not in existing_ids]
+        if missing_ids:
+            raise NotFound(detail=f"The requested words word_ids={missing_ids} do not exist or you don't have "
+                                  f"access to them.")
+
+    @action(detail=False, methods=['get'])
+    def due(self, request, *args, **kwargs):
+        """
+        Endpoint returning the queue of words to study: the most overdue words first, then never-reviewed words.
+        Accepts optional `words-list`, `limit` and `cursor` query parameters.
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.DUE_WORDS_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+
+        if not (1 <= limit <= self.DUE_WORDS_MAX_LIMIT):
+            raise ValidationError({'limit': f'Must be between 1 and {self.DUE_WORDS_MAX_LIMIT}.'})
+
+        try:
+            words, next_cursor = get_due_words(self.get_queryset(), limit, request.query_params.get('cursor'))
+        except ValueError as e:
+            raise ValidationError({'cursor': str(e)})
 
-            return Response({"message": "Changes saved successfully!"}, status=status.HTTP_200_OK)
+        serializer = self.get_serializer(words, many=True)
+        return Response({"results": serializer.data, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
 
 
-class WordsListViewSet(viewsets.ModelViewSet):
+class WordsListViewSet(ConditionalListMixin, ValuesListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = WordsListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
+    # The due counts also change when a scheduled review comes due, so the next one is part of the ETag
+    etag_fields = ['id', 'version', 'modified_at', 'next_due']
+
+    RESCHEDULE_MODES = {
+        'shift': shift_reviews,
+        'spread': spread_overdue_reviews,
+    }
+    RESCHEDULE_MAX_DAYS = 365
 
     def get_queryset(self):
-        return WordsList.objects.filter(user=self.request.user)
+        return annotate_word_counts(WordsList.objects.filter(user=self.request.user))
+
+    def get_versioned_words_lists(self):
+        # One seek per list on the (words_list, next_review) index rather than an aggregate over every word
+        next_due = Word.objects.filter(words_list=OuterRef('pk'), next_review__gt=now()).order_by('next_review')
+        return WordsList.objects.filter(user=self.request.user).annotate(
+            next_due=Subquery(next_due.values('next_review')[:1])
+        )
+
+    def perform_create(self, serializer):
+        words_list = serializer.save()
+        words_list.word_count = words_list.due_count = words_list.new_count = words_list.mastered_count = 0
+
+    def perform_update(self, serializer):
+        words_list = serializer.save()
+        bump_words_lists_version([words_list.id])
+
+    def perform_destroy(self, instance):
+        # Clients drop the words of a deleted list along with it, so they get no tombstones of their own
+        words_list_id = instance.id
+        instance.delete()
+        record_deletions(self.request.user, Tombstone.WORDS_LIST, [words_list_id])
 
     def create(self, request, *args, **kwargs):
         user = request.user.id
@@ -133,6 +335,83 @@ class WordsListViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @action(detail=True, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request, *args, **kwargs):
+        """
+        Endpoint importing words from an uploaded CSV, TSV or Anki text file, sent as the multipart `file` field.
+        The optional `format` field overrides the format guessed from the file name. Words already in the
+        list are skipped.
+        """
+        try:
+            words_list = WordsList.objects.get(id=parse_id(kwargs['pk']), user=request.user)
+        except WordsList.DoesNotExist:
+            raise NotFound(detail="The requested words list does not exist or you don't have access to it.")
+
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            raise ValidationError({'file': 'This field is required.'})
+
+        file_format = request.data.get('format') or guess_import_format(uploaded_file.name)
+        if file_format not in IMPORT_FORMATS:
+            raise ValidationError({'format': f"Valid options are: {', '.join(IMPORT_FORMATS)}."})
+
+        # Large uploads are spooled to a temporary file by Django, which is read back one line at a time
+        lines = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', errors='replace', newline='')
+        totals = import_words(words_list, lines, file_format)
+        return Response(totals, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def reschedule(self, request, *args, **kwargs):
+        """
+        Endpoint rescheduling the words of a list after a break, without loading them.
+        With `mode` "shift", every scheduled review is postponed by `days` days; with "spread", the overdue
+        words are spread evenly over the next `days` days.
+
+        Expected request body:
+        { "mode": "spread", "days": 7 }
+        """
+        try:
+            words_list = WordsList.objects.get(id=parse_id(kwargs['pk']), user=request.user)
+        except WordsList.DoesNotExist:
+            raise NotFound(detail="The requested words list does not exist or you don't have access to it.")
+
+        mode = request.data.get('mode')
+        if mode not in self.RESCHEDULE_MODES:
+            raise ValidationError({'mode': f"Valid options are: {', '.join(self.RESCHEDULE_MODES)}."})
+
+        try:
+            days = int(request.data.get('days'))
+        except (TypeError, ValueError):
+            raise ValidationError({'days': 'Must be an integer.'})
+
+        if not (1 <= days <= self.RESCHEDULE_MAX_DAYS):
+            raise ValidationError({'days': f'Must be between 1 and {self.RESCHEDULE_MAX_DAYS}.'})
+
+        with write_transaction():
+            rescheduled = self.RESCHEDULE_MODES[mode](Word.objects.filter(words_list=words_list), days)
+            if rescheduled:
+                bump_words_lists_version([words_list.id])
+
+        return Response({'rescheduled': rescheduled}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], renderer_classes=[CSVRenderer, JSONLinesRenderer])
+    def export(self, request, *args, **kwargs):
+        """
+        Endpoint streaming the words of a list as a CSV (default) or JSON Lines file, chosen with the `format`
+        query parameter or the Accept header.
+        """
+        try:
+            words_list = WordsList.objects.get(id=parse_id(kwargs['pk']), user=request.user)
+        except WordsList.DoesNotExist:
+            raise NotFound(detail="The requested words list does not exist or you don't have access to it.")
+
+        renderer = request.accepted_renderer
+        content = export_words(Word.objects.filter(words_list=words_list), renderer.format)
+        response = StreamingHttpResponse(content, content_type=renderer.media_type)
+        file_name = f"{slugify(words_list.name) or 'words'}.{renderer.format}"
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        return response
+
 
 class GenerateStoryAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -141,6 +420,7 @@ class GenerateStoryAPIView(APIView):
         """
         Endpoint to generate a story using ChatGPT.
         Accepts `words`, `language_level`, and `tone` in the request payload.
+        With `async` set to true, the story is queued as a job for the story worker instead.
         """
         words = request.data.get('words', None)
         language_level = request.data.get('language_level', 'B1')
@@ -150,15 +430,76 @@ class GenerateStoryAPIView(APIView):
             return Response({'error': "The 'words' field is required and must be a non-empty list."},
                             status=status.HTTP_400_BAD_REQUEST)
 
+        if request.data.get('async', False):
+            job = StoryJob.objects.create(user=request.user, words=words, language_level=language_level, tone=tone)
+            return Response({'job_id': job.id, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+
         try:
-            generator = StoryGenerator(words=words, language_level=language_level, tone=tone)
-            result = generator.generate_story()
+            result, cache_hit = generate_user_story(request.user, words, language_level, tone)
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except RuntimeError as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        return Response(result, status=status.HTTP_200_OK)
+        return Response(result, status=status.HTTP_200_OK, headers={'X-Story-Cache': 'hit' if cache_hit else 'miss'})
+
+
+class GenerateStoryStreamAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Endpoint to generate a story as a stream of server-sent events.
+        Accepts the same payload as `GenerateStoryAPIView`. Sends `story` events with HTML chunks as they arrive,
+        then a single `result` event with the story, questions and answers, or an `error` event.
+        """
+        words = request.data.get('words', None)
+        language_level = request.data.get('language_level', 'B1')
+        tone = request.data.get('tone', 'Neutral')
+
+        if not words or not isinstance(words, list):
+            return Response({'error': "The 'words' field is required and must be a non-empty list."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            events = stream_user_story(request.user, words, language_level, tone)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except RuntimeError as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        response = StreamingHttpResponse(self._format_events(events), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def _format_events(events):
+        try:
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+
+class StoryJobAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, *args, **kwargs):
+        """
+        Endpoint to poll an asynchronous story generation job.
+        """
+        try:
+            job = StoryJob.objects.get(id=job_id, user=request.user)
+        except StoryJob.DoesNotExist:
+            raise NotFound(detail="The requested story job does not exist or you don't have access to it.")
+
+        return Response({
+            'job_id': job.id,
+            'status': job.status,
+            'result': job.result,
+            'error': job.error,
+        }, status=status.HTTP_200_OK)
 
 
 class WordsReviewView(APIView):
@@ -193,6 +534,15 @@ class WordsReviewView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+            # Fetch every referenced word with a single query
+            word_ids = set()
+            for game_type, words in request.data.items():
+                if game_type in self.GAME_RATING_LIMITS:
+                    word_ids.update(parse_id(word_data.get("word_id")) for word_data in words)
+            word_ids.discard(None)
+            words_by_id = Word.objects.filter(words_list__user=request.user).in_bulk(word_ids)
+            reviews = []
+
             for game_type, words in request.data.items():
                 if game_type not in self.GAME_RATING_LIMITS:
                     errors.append(
@@ -209,9 +559,8 @@ class WordsReviewView(APIView):
                         errors.append({"error": f"Missing 'word_id' in {game_type} game."})
                         continue
 
-                    try:
-                        word = Word.objects.get(pk=word_id, words_list__user=request.user)
-                    except Word.DoesNotExist:
+                    word = words_by_id.get(parse_id(word_id))
+                    if word is None:
                         errors.append({"error": f"Word with ID {word_id} not found or does not belong to the user."})
                         continue
 
@@ -222,8 +571,7 @@ class WordsReviewView(APIView):
                                 {"error": f"Invalid or missing 'typed_word' for word_id {word_id} in write_words game."}
                             )
                             continue
-                        similarity_score = compare_word_similarity(word.word, typed_word)
-                        rating = get_grade_based_on_similarity(similarity_score)
+                        rating = answer_grade(word.word, typed_word)
                     else:
                         rating = word_data.get("rating")
 
@@ -245,15 +593,37 @@ class WordsReviewView(APIView):
                         )
                         continue
 
-                    # Update word repetition using SuperMemo2
-                    try:
-                        updated_word = update_word_repetition(word, rating)
-                        updated_words.append({
-                            "word_id": word_id,
-                            "next_review": updated_word.next_review
-                        })
-                    except Exception as e:
-                        errors.append({"error": f"Failed to update word_id {word_id}: {str(e)}"})
+                    if word.last_reviewed and None in (word.easiness, word.interval, word.repetitions):
+                        errors.append({"error": f"Failed to update word_id {word_id}: incomplete repetition data."})
+                        continue
+
+                    reviews.append((word_id, word, rating, game_type))
+
+            # Update words repetition using the vectorized SuperMemo2 scheduler and persist them at once
+            if reviews:
+                # The moment is taken once the write lock is held, so the words can't be committed with a
+                # `modified_at` older than a sync cursor handed out while waiting for it
+                with write_transaction():
+                    review_datetime = now()
+                    intervals = {word.pk: word.interval for _, word, _, _ in reviews}
+                    next_reviews = update_words_repetition([(word, rating) for _, word, rating, _ in reviews],
+                                                           review_datetime)
+                    updated_words = []
+                    events = []
+
+                    for (word_id, word, rating, game_type), next_review in zip(reviews, next_reviews):
+                        word.modified_at = review_datetime
+                        updated_words.append({"word_id": word_id, "next_review": next_review})
+                        next_interval = (next_review - review_datetime).days
+                        events.append(ReviewEvent(word_id=word.pk, reviewed_at=review_datetime, quality=rating,
+                                                  game_type=game_type, previous_interval=intervals[word.pk],
+                                                  next_interval=next_interval))
+                        intervals[word.pk] = next_interval
+
+                    Word.objects.bulk_update({word.pk: word for _, word, _, _ in reviews}.values(),
+                                             [*REPETITION_FIELDS, 'modified_at'])
+                    bump_words_lists_version(word.words_list_id for _, word, _, _ in reviews)
+                    log_review_events(events)
 
             # Determine response status
             if errors and updated_words:
@@ -274,3 +644,58 @@ class WordsReviewView(APIView):
         except Exception as e:
             return Response({"error": f"Unexpected server error: {str(e)}"},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SyncAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Endpoint returning the words lists and words created, modified or deleted since the `since` cursor
+        of a previous sync. Without it, everything is returned and `full` is true.
+
+        Response body:
+        {
+            "full": false,
+            "words_lists": [{ "id": 1, ... }],
+            "words": [{ "id": 2, ... }],
+            "deleted": { "words_lists": [3], "words": [4] },
+            "cursor": "..."
+        }
+        """
+        try:
+            changes = get_changes(request.user, request.query_params.get('since'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(changes, status=status.HTTP_200_OK)
+
+
+class ForecastAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 365
+
+    def get(self, request, *args, **kwargs):
+        """
+        Endpoint returning the number of reviews due on each of the next `days` days (30 by default), overdue
+        words included in today's count. Accepts an optional `words-list` query parameter.
+        """
+        try:
+            days = int(request.query_params.get('days', self.DEFAULT_DAYS))
+        except ValueError:
+            return Response({"error": "'days' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not (1 <= days <= self.MAX_DAYS):
+            return Response({"error": f"'days' must be between 1 and {self.MAX_DAYS}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        words_list_id = request.query_params.get('words-list', None)
+        if words_list_id is not None:
+            words_list_id = parse_id(words_list_id)
+            if not WordsList.objects.filter(id=words_list_id, user=request.user).exists():
+                raise NotFound(detail="The requested words list does not exist or you don't have access to it.")
+
+        forecast = get_review_forecast(request.user, days, words_list_id)
+        return Response({"days": days, **forecast}, status=status.HTTP_200_OK)
@@ -12,9 +12,14 @@ type PostWordsPayload = {
     delete: number[]
 }
 
-export async function postWords(payload: PostWordsPayload, wordsListId: number) {
+type PostWordsResponse = {
+    message: string
+    created_ids: number[]
+}
+
+export async function postWords(payload: PostWordsPayload, wordsListId: number): Promise<PostWordsResponse> {
     try {
-        const response = await api.post(`/api/words/?words-list=${wordsListId}`, payload)
+        const response = await api.post<PostWordsResponse>(`/api/words/?words-list=${wordsListId}`, payload)
         return response.data
     } catch (error: any) {
         console.error("Error during postWords request:", error)
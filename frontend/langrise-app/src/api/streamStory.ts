@@ -0,0 +1,67 @@
+import api, { refreshAccessToken } from '../services/axiosConfig'
+
+type StoryPayload = {
+    words: string[]
+    language_level: string
+    tone: string
+}
+
+export type StoryResult = {
+    story: string
+    questions: string
+    answers: string
+}
+
+/**
+ * Requests a story as server-sent events.
+ * Calls `onStoryChunk` with every HTML chunk as it arrives and resolves with the full result.
+ */
+export async function streamStory(payload: StoryPayload, onStoryChunk: (chunk: string) => void): Promise<StoryResult> {
+    const postStory = (accessToken: string | null) => fetch(`${api.defaults.baseURL}api/generate-story/stream/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            Authorization: `Bearer ${accessToken}`
+        },
+        body: JSON.stringify(payload)
+    })
+
+    let response = await postStory(localStorage.getItem('access_token'))
+    // fetch bypasses the axios interceptors, so an expired token is refreshed the same way here, once
+    if (response.status === 401) {
+        response = await postStory(await refreshAccessToken())
+    }
+
+    if (!response.ok || !response.body) {
+        throw new Error(`Could not stream the story (status ${response.status}).`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+
+    while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        const events = buffer.split('\n\n')
+        buffer = events.pop() ?? ''
+
+        for (const rawEvent of events) {
+            const [eventLine, dataLine] = rawEvent.split('\n')
+            const event = eventLine.replace(/^event: /, '')
+            const data = JSON.parse(dataLine.replace(/^data: /, ''))
+
+            if (event === 'story') {
+                onStoryChunk(data)
+            } else if (event === 'result') {
+                return data
+            } else if (event === 'error') {
+                throw new Error(data.error)
+            }
+        }
+    }
+
+    throw new Error('The story stream ended unexpectedly.')
+}
@@ -31,7 +31,8 @@ export default function RevealWords({ wordsListId, setView, setWordsToLearn, ...
   const [wordsData, setWordsData] = useState<Word[] | undefined | null>(null)
   const [sortKey, setSortKey] = useState<keyof Word>("next_review")
   const [ascending, setAscending] = useState(true)
-  const {data, error, isLoading} = useFetch<Word[]>(`/api/words/?words-list=${wordsListId}`)
+  const {data, error, isLoading} = useFetch<Word[]>(
+      `/api/words/?words-list=${wordsListId}&fields=id,word,translation,pronunciation,last_reviewed,next_review`)
   const [editingRowId, setEditingRowId] = useState<number | null>(null)
   const [editedRow, setEditedRow] = useState<Word | null>(null)
   const [wordsChanged, setWordsChanged] = useState(false)
@@ -2,7 +2,6 @@ import React, {SetStateAction, useState} from "react"
 import Popup from "reactjs-popup"
 import { type Word } from "../RevealWords.tsx"
 import { postWords } from "../../api/postWords"
-import api from "../../services/axiosConfig.ts"
 import sortWords from "../utils/sortWords.ts"
 
 type SaveWordsButtonProps = {
@@ -40,9 +39,9 @@ export default function SaveWordsButton({
         const originalWordsMap = new Map(validOriginalWordsData?.map(word => [word.id, word]) || [])
         const newWordsMap = new Map(validWordsData?.map(word => [word.id, word]) || [])
 
-        const add = Array.from(newWordsMap.values())
+        const addedWords = Array.from(newWordsMap.values())
             .filter(word => !originalWordsMap.has(word.id))
-            .map(({ id, ...rest }) => rest)
+        const add = addedWords.map(({ id, ...rest }) => rest)
 
         const update = Array.from(newWordsMap.values()).filter(
             word =>
@@ -56,26 +55,26 @@ export default function SaveWordsButton({
             .map(word => word.id)
 
         return {
-            add,
-            update,
-            delete: deleteIds
+            payload: {
+                add,
+                update,
+                delete: deleteIds
+            },
+            addedIds: addedWords.map(word => word.id),
+            savedWords: validWordsData
         }
     }
 
     const handleClick = async () => {
         setPopupOpen(true)
-        const payload = getPayload()
+        const { payload, addedIds, savedWords } = getPayload()
         try {
-            await postWords(payload, wordsListId)
-            const updatedWords = await getWords(wordsListId)
-            const updatedFormatedData = updatedWords.map(word => ({
-                ...word,
-                last_reviewed: word.last_reviewed ? new Date(word.last_reviewed) : null,
-                next_review: word.next_review ? new Date(word.next_review) : null
-            }))
-            const sortedUpdatedFormatedData = sortWords(updatedFormatedData, sortKey, ascending)
-            setOriginalWordsData(sortedUpdatedFormatedData)
-            setWordsData(sortedUpdatedFormatedData)
+            const { created_ids: createdIds } = await postWords(payload, wordsListId)
+            const createdIdsMap = new Map(addedIds.map((temporaryId, index) => [temporaryId, createdIds[index]]))
+            const updatedWords = savedWords.map(word => ({ ...word, id: createdIdsMap.get(word.id) ?? word.id }))
+            const sortedUpdatedWords = sortWords(updatedWords, sortKey, ascending)
+            setOriginalWordsData(sortedUpdatedWords)
+            setWordsData(sortedUpdatedWords)
             setWordsChanged(false)
             alert("Words saved successfully")
         } catch (error) {
@@ -86,16 +85,6 @@ export default function SaveWordsButton({
         }
     }
 
-    async function getWords(wordsListId: number): Promise<Word[]> {
-        try {
-            const response = await api.get<Word[]>(`/api/words/?words-list=${wordsListId}`);
-            return response.data
-        } catch (error) {
-            console.error("Error fetching words:", error)
-            throw error
-        }
-    }
-
     return (
         <>
             <button disabled={!wordsChanged || isPopupOpen} id="saveWordsButton" onClick={handleClick}>
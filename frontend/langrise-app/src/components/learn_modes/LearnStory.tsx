@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { type Word } from '../RevealWords.tsx'
-import api from "../../services/axiosConfig.ts"
+import { streamStory } from "../../api/streamStory.ts"
 import {GAME_RATING_LIMITS, sendWordReview} from "../../api/sendWordReview.ts";
 
 type ParsedQuestion = {
@@ -31,12 +31,15 @@ export default function LearnStory({ words, language_level, tone, isLoadingPosti
     const fetchStory = async () => {
       setIsLoading(true)
       try {
-        const response = await api.post('/api/generate-story/', {
+        setStory('')
+        const data = await streamStory({
           words: words.map(w => w.word),
           language_level,
           tone
+        }, chunk => {
+          setStory(previousStory => previousStory + chunk)
+          setIsLoading(false)
         })
-        const data = await response.data
         setStory(data.story || '')
 
         const questionsArray = (data.questions || '')
@@ -4,6 +4,17 @@ const api = axios.create({
     baseURL: "http://localhost:8000/",
 });
 
+// Exchanges the refresh token for a new access token and stores it; shared with requests made outside of axios
+export async function refreshAccessToken(): Promise<string> {
+    const refreshToken = localStorage.getItem("refresh_token");
+    const { data } = await axios.post(`${api.defaults.baseURL}api/token/refresh/`, {
+        refresh: refreshToken,
+    });
+
+    localStorage.setItem("access_token", data.access);
+    return data.access;
+}
+
 // Add a request interceptor to attach the token
 api.interceptors.request.use(
     (config) => {
@@ -26,13 +37,8 @@ api.interceptors.response.use(
             originalRequest._retry = true;
 
             try {
-                const refreshToken = localStorage.getItem("refresh_token");
-                const { data } = await axios.post("http://localhost:8000/api/token/refresh/", {
-                    refresh: refreshToken,
-                });
-
-                localStorage.setItem("access_token", data.access);
-                originalRequest.headers.Authorization = `Bearer ${data.access}`;
+                const accessToken = await refreshAccessToken();
+                originalRequest.headers.Authorization = `Bearer ${accessToken}`;
 
                 return axios(originalRequest);
             } catch (refreshError) {